@@ -1,37 +1,114 @@
 # sections/conclusion.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
-from typing import Iterable
+import re
+from dataclasses import dataclass
+from utils.filters import apply_filters
+import io
+
+try:
+    import polars as pl
+    _HAS_POLARS = True
+except Exception:
+    _HAS_POLARS = False
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _median_by_year_kernel(years, vals, y_min, y_max):
+        # Counting sort on the year offset, then a NaN-skipping median per bucket
+        n = y_max - y_min + 1
+        counts = np.zeros(n, np.int64)
+        for i in range(years.size):
+            counts[years[i] - y_min] += 1
+        starts = np.zeros(n + 1, np.int64)
+        starts[1:] = np.cumsum(counts)
+        fill = starts[:-1].copy()
+        buf = np.empty(years.size, np.float64)
+        for i in range(years.size):
+            k = years[i] - y_min
+            buf[fill[k]] = vals[i]
+            fill[k] += 1
+        out = np.full(n, np.nan)
+        for k in range(n):
+            seg = buf[starts[k]:starts[k + 1]]
+            seg = seg[~np.isnan(seg)]
+            if seg.size:
+                out[k] = np.median(seg)
+        return out, counts
 
 
 # ---------------- Utilities (kept local so this file is standalone) ----------------
+# Compiled once at import; case-insensitivity is baked in (pandas rejects flags with a compiled pattern)
+_QU_RE = re.compile(r"^QU([1-5])$")
+_UNDER50_RE = re.compile(r"Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49", re.IGNORECASE)
+
+@st.cache_data(show_spinner=False)
 def _coerce_year(df: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Numeric year column, computed once per input table.
+    Keyed on content rather than id(): after the loader's daily reload a
+    recycled id could match a stale entry.
+    """
     if df is None or len(df) == 0:
         return pd.DataFrame()
-    d = df.copy()
-    if "year" in d.columns:
-        d["year"] = pd.to_numeric(d["year"], errors="coerce")
-    return d
-
-def _year_bounds(dfs: Iterable[pd.DataFrame]) -> tuple[int | None, int | None]:
-    years = []
+    if "year" in df.columns and not pd.api.types.is_numeric_dtype(df["year"]):
+        return df.assign(year=pd.to_numeric(df["year"], errors="coerce"))
+    return df
+
+@st.cache_data(show_spinner=False)
+def _categorize(df: pd.DataFrame, col: str = "country") -> pd.DataFrame:
+    """Cast a low-cardinality key to category once, so filters compare int codes."""
+    if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+        return df.assign(**{col: df[col].astype("category")})
+    return df
+
+@st.cache_data(show_spinner=False)
+def _flag_under50(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorical age + precomputed is_under50 flag (TOTAL included as fallback).
+    The regex runs on the handful of distinct age codes, not on every row.
+    """
+    if "age" not in df.columns or "is_under50" in df.columns:
+        return df
+    age = df["age"].astype("category")
+    cats = age.cat.categories.astype(str)
+    lookup = np.asarray(cats.str.contains(_UNDER50_RE) | (cats == "TOTAL"), dtype=bool)
+    codes = age.cat.codes.to_numpy()
+    return df.assign(age=age, is_under50=np.where(codes >= 0, lookup[codes], False))
+
+@st.cache_data(show_spinner=False)
+def _year_bounds(dfs: tuple[pd.DataFrame, ...]) -> tuple[int | None, int | None]:
+    """Min/max year over the tables, once per dataset: two skipna reductions per frame."""
+    mins, maxs = [], []
     for d in dfs:
         if isinstance(d, pd.DataFrame) and "year" in d.columns:
-            years.extend(pd.to_numeric(d["year"], errors="coerce").dropna().unique().tolist())
-    if not years:
+            y = pd.to_numeric(d["year"], errors="coerce")
+            lo, hi = y.min(), y.max()
+            if pd.notna(lo):
+                mins.append(lo)
+                maxs.append(hi)
+    if not mins:
         return None, None
-    return int(min(years)), int(max(years))
+    return int(min(mins)), int(max(maxs))
 
-def _filter_years(df: pd.DataFrame, y0: int | None, y1: int | None) -> pd.DataFrame:
-    if df is None or df.empty or "year" not in df.columns or y0 is None or y1 is None:
-        return df
-    return df[(df["year"] >= y0) & (df["year"] <= y1)]
+def _countries(d: pd.DataFrame | None) -> np.ndarray:
+    if isinstance(d, pd.DataFrame) and "country" in d.columns:
+        return d["country"].dropna().unique()
+    return np.array([], dtype=object)
 
-def _filter_countries(df: pd.DataFrame, countries: list[str]) -> pd.DataFrame:
-    if df is None or df.empty or "country" not in df.columns or not countries:
-        return df
-    return df[df["country"].isin(countries)]
+@st.cache_data(show_spinner=False)
+def _all_countries(df_screening: pd.DataFrame, df_mortality: pd.DataFrame, df_exam_income: pd.DataFrame) -> list[str]:
+    """Sorted country codes across the three tables, computed once per dataset."""
+    parts = [np.asarray(_countries(d), dtype=object) for d in (df_screening, df_mortality, df_exam_income)]
+    return np.unique(np.concatenate(parts)).tolist()
 
 def _mortality_under50(df_mortality: pd.DataFrame) -> pd.DataFrame:
     """
@@ -40,14 +117,203 @@ def _mortality_under50(df_mortality: pd.DataFrame) -> pd.DataFrame:
     """
     if df_mortality is None or df_mortality.empty or "age" not in df_mortality.columns:
         return df_mortality
-    m = df_mortality.copy()
-    age = m["age"].astype(str)
-    mask = (
-        age.str.contains("Y_LT", case=False)
-        | age.str.contains(r"Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49", regex=True, case=False)
-        | age.eq("TOTAL")
-    )
-    return m[mask]
+    if "is_under50" in df_mortality.columns:
+        return df_mortality.loc[df_mortality["is_under50"].to_numpy()]
+    age = df_mortality["age"].astype("string")
+    mask = age.str.contains(_UNDER50_RE) | age.eq("TOTAL")
+    return df_mortality.loc[mask]
+
+def _median_by_year(df: pd.DataFrame, col: str) -> pd.Series:
+    """Per-year median of ``col`` (same shape as groupby("year")[col].median()), JIT-compiled when numba is available."""
+    if not _HAS_NUMBA:
+        return df.groupby("year", sort=True)[col].median()
+    d = df.dropna(subset=["year"])
+    if d.empty:
+        return pd.Series(dtype="float64", name=col, index=pd.Index([], name="year"))
+    years = d["year"].to_numpy(dtype=np.int64)
+    vals = d[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    lo, hi = int(years.min()), int(years.max())
+    med, counts = _median_by_year_kernel(years, vals, lo, hi)
+    seen = counts > 0
+    return pd.Series(med[seen], index=pd.Index(np.arange(lo, hi + 1)[seen], name="year"), name=col)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _lazy(df: pd.DataFrame):
+    """Polars LazyFrame over a table, converted once and shared."""
+    return pl.from_pandas(df).lazy()
+
+def _lazy_median_by_year(df: pd.DataFrame, col: str, under50: bool = False) -> pd.Series:
+    """
+    Per-year median as one polars query.
+    With ``under50``, mirrors _mortality_under50 and prefers explicit age rows over TOTAL.
+    """
+    pred = pl.col("year").is_not_null()
+    if under50 and "is_under50" in df.columns:
+        pred &= pl.col("is_under50")
+    lf = _lazy(df).filter(pred)
+    if under50 and "age" in df.columns:
+        explicit = pl.col("age").cast(pl.Utf8) != "TOTAL"
+        lf = lf.filter(explicit | ~explicit.any())
+    out = lf.group_by("year").agg(pl.col(col).median()).sort("year").collect().to_pandas()
+    return out.set_index("year")[col]
+
+@dataclass(frozen=True)
+class KpiResults:
+    """Numbers and wording behind the conclusion KPIs, mini-trends and takeaways."""
+    scr_val: str
+    scr_delta: str
+    scr_by_year: pd.Series
+    mort_val: str
+    mort_delta: str
+    mort_by_year: pd.Series
+    gap_val: str
+    gap_note: str
+    gap_year: int | None
+    paragraphs: tuple[str, ...]
+
+@st.cache_data(show_spinner=False)
+def _compute_kpis(scr_f: pd.DataFrame, mort_f: pd.DataFrame, exam_f: pd.DataFrame) -> KpiResults:
+    """
+    Pure data side of the conclusion (no Streamlit calls), cached per filtered slice
+    so UI-only reruns skip it.
+    """
+    # Yearly medians (shared by KPIs and mini-trends)
+    scr_by_year = mort_by_year = pd.Series(dtype="float64")
+    if not scr_f.empty and {"screening_rate", "year"}.issubset(scr_f.columns):
+        if _HAS_POLARS:
+            scr_by_year = _lazy_median_by_year(scr_f, "screening_rate")
+        else:
+            scr_by_year = _median_by_year(scr_f, "screening_rate")
+    mort_sub = _mortality_under50(mort_f)
+    if mort_sub is not None and not mort_sub.empty and {"mortality_rate", "year"}.issubset(mort_sub.columns):
+        if _HAS_POLARS:
+            mort_by_year = _lazy_median_by_year(mort_f, "mortality_rate", under50=True)
+        else:
+            # prefer explicit under-50 rows; else use what's available
+            explicit = mort_sub[mort_sub["age"].ne("TOTAL")] if "age" in mort_sub.columns else mort_sub
+            muse = explicit if not explicit.empty else mort_sub
+            mort_by_year = _median_by_year(muse, "mortality_rate")
+
+    # Income gap Q5 − Q1 in the latest survey year
+    gap, gap_year = None, None
+    if not exam_f.empty and {"income_quintile", "exam_rate", "year"}.issubset(exam_f.columns):
+        ys = exam_f["year"].dropna()
+        if not ys.empty:
+            y_last = int(ys.max())
+            last = exam_f.loc[exam_f["year"].eq(y_last)]
+            # Canonicalize quintiles (QU1 → Q1) on the latest-year rows only,
+            # then every quintile's median in one groupby
+            q = last["income_quintile"].astype("string").str.upper().str.replace(_QU_RE, r"Q\1", regex=True)
+            by_q = last["exam_rate"].groupby(q, sort=False).median()
+            q5, q1 = by_q.get("Q5"), by_q.get("Q1")
+            if not _isna(q5) and not _isna(q1):
+                gap, gap_year = float(q5 - q1), y_last
+
+    # KPI 1: Screening median latest and delta vs first
+    scr_val, scr_delta = "-", ""
+    scr_first, scr_last = None, None
+    if not scr_by_year.empty:
+        y_last, y_first = int(scr_by_year.index.max()), int(scr_by_year.index.min())
+        latest, base = scr_by_year.loc[y_last], scr_by_year.loc[y_first]
+        scr_first, scr_last = base, latest
+        if not _isna(latest):
+            scr_val = f"{latest:.1f}"
+        if not _isna(latest) and not _isna(base):
+            scr_delta = f"{(latest - base):+,.1f} vs {y_first}"
+
+    # KPI 2: Mortality under 50 median latest and delta vs first (fallback to TOTAL if needed)
+    mort_val, mort_delta = "-", ""
+    mort_first, mort_last = None, None
+    if not mort_by_year.empty:
+        y_last, y_first = int(mort_by_year.index.max()), int(mort_by_year.index.min())
+        latest, base = mort_by_year.loc[y_last], mort_by_year.loc[y_first]
+        mort_first, mort_last = base, latest
+        if not _isna(latest):
+            mort_val = f"{latest:.1f}"
+        if not _isna(latest) and not _isna(base):
+            mort_delta = f"{(latest - base):+,.1f} vs {y_first}"
+
+    # KPI 3: Income gap Q5 − Q1 (under 50, latest survey year)
+    gap_val, gap_note = "-", ""
+    if gap is not None:
+        gap_val = f"{gap:.1f} pp"
+        gap_note = f"Year {gap_year}"
+
+    # Sentence-style takeaways
+    scr_med = scr_by_year.dropna().reset_index()
+    mort_med = mort_by_year.dropna().reset_index()
+    paragraphs = []
+
+    # Screening sentence
+    if scr_last is not None:
+        # Trend wording from medians if available; otherwise from first/last KPIs
+        scr_trend_phrase = None
+        if not scr_med.empty:
+            scr_trend_phrase = _trend_wording(
+                float(scr_med["screening_rate"].iloc[0]),
+                float(scr_med["screening_rate"].iloc[-1]),
+                up_word="has increased",
+                down_word="has decreased",
+            )
+        else:
+            scr_trend_phrase = _trend_wording(scr_first, scr_last, up_word="has increased", down_word="has decreased")
+
+        sentence = f"In the selected countries and years, the median **organized screening rate** is **{scr_last:.1f}%** in the latest year. "
+        if scr_trend_phrase:
+            sentence += f"Across the period, it {scr_trend_phrase}."
+        if isinstance(scr_delta, str) and scr_delta:
+            sentence += f" That corresponds to a change of {scr_delta.replace(' vs', ' since')}."
+        paragraphs.append(sentence)
+
+    # Mortality sentence
+    if mort_last is not None:
+        mort_trend_phrase = None
+        if not mort_med.empty:
+            mort_trend_phrase = _trend_wording(
+                float(mort_med["mortality_rate"].iloc[0]) if not mort_med.empty else None,
+                float(mort_med["mortality_rate"].iloc[-1]) if not mort_med.empty else None,
+                up_word="has increased",
+                down_word="has decreased",
+            )
+        else:
+            mort_trend_phrase = _trend_wording(mort_first, mort_last, up_word="has increased", down_word="has decreased")
+
+        sentence = (
+            f"For **mortality** (under 50 preferred when available), the median rate is **{mort_last:.1f} per 100,000** "
+            f"in the latest year."
+        )
+        if mort_trend_phrase:
+            sentence += f" Over the period, it {mort_trend_phrase}."
+        if isinstance(mort_delta, str) and mort_delta:
+            sentence += f" That is {mort_delta.replace(' vs', ' since')}."
+        paragraphs.append(sentence)
+
+    # Income gap sentence
+    if gap_val != "-":
+        sentence = (
+            f"In the **latest survey year**"
+            f"{f' ({gap_year})' if gap_year else ''}, women under 50 in the highest income quintile (Q5) "
+            f"report higher X-ray exam uptake than those in Q1 by about **{gap_val}**."
+        )
+        paragraphs.append(sentence)
+
+    if not paragraphs:
+        paragraphs = [
+            "The current filters do not yield enough comparable data to generate a summary. Try widening the year range or adding more countries."
+        ]
+
+    return KpiResults(scr_val, scr_delta, scr_by_year, mort_val, mort_delta, mort_by_year,
+                      gap_val, gap_note, gap_year, tuple(paragraphs))
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """CSV payload for a download button, serialized once per distinct slice."""
+    if _HAS_POLARS:
+        # Rust CSV writer, no per-row Python formatting
+        buf = io.BytesIO()
+        pl.from_pandas(df).write_csv(buf)
+        return buf.getvalue()
+    return df.to_csv(index=False).encode("utf-8")
 
 def _styled_chart(chart, title=None, height=220):
     """Uniform border + clean axes."""
@@ -64,20 +330,36 @@ def _styled_chart(chart, title=None, height=220):
         .configure_title(anchor="start", fontSize=13, color="#222", fontWeight="bold")
     )
 
+def _make_trend(df: pd.DataFrame, y_col: str, y_title: str, color: str | None = None):
+    """Shared template for the yearly median mini-trends."""
+    mark = {"point": True} if color is None else {"point": True, "color": color}
+    line = alt.Chart(df).mark_line(**mark).encode(
+        x=alt.X("year:Q", title="Year"),
+        y=alt.Y(f"{y_col}:Q", title=y_title),
+        tooltip=[alt.Tooltip("year:Q", format=".0f"), alt.Tooltip(f"{y_col}:Q", format=".1f")],
+    )
+    return _styled_chart(line)
+
+@st.cache_data(show_spinner=False)
+def _trend_spec(df: pd.DataFrame, y_col: str, y_title: str, color: str | None = None) -> dict:
+    """Vega-Lite dict for a mini-trend; Altair validation runs once per distinct series."""
+    return _make_trend(df, y_col, y_title, color).to_dict()
+
+def _isna(x) -> bool:
+    """Scalar NaN/None check; NaN is the only value unequal to itself (skips pd.isna's array dispatch)."""
+    return x is None or x != x
+
 def _trend_wording(first_val: float | None, last_val: float | None, up_word="has increased", down_word="has decreased") -> str | None:
     """
     Return a short phrase describing trend direction based on first vs last.
     Uses a small threshold to avoid calling noise a trend.
     """
-    if first_val is None or pd.isna(first_val) or last_val is None or pd.isna(last_val):
+    if _isna(first_val) or _isna(last_val):
         return None
     diff = float(last_val) - float(first_val)
     # threshold in natural units: 1.0 for percentages or per-100k rates
-    if diff >= 1.0:
-        return f"{up_word} by {diff:.1f}"
-    if diff <= -1.0:
-        return f"{down_word} by {abs(diff):.1f}"
-    return "has remained relatively stable"
+    sign = (diff >= 1.0) - (diff <= -1.0)
+    return (f"{down_word} by {abs(diff):.1f}", "has remained relatively stable", f"{up_word} by {diff:.1f}")[sign + 1]
 
 
 # ---------------- Render ----------------
@@ -95,47 +377,23 @@ def render_conclusion(
       df_exam_income: country, year, duration, age_group, income_quintile, exam_rate
     """
 
-    # Local style
-    st.markdown(
-        """
-        <style>
-        .pink-chip {
-            display:inline-block; padding:0.18rem 0.5rem; margin:0 0.25rem 0.25rem 0;
-            border-radius:999px; background:rgba(255,105,180,0.12);
-            border:1px solid rgba(255,105,180,0.35); font-size:0.85rem;
-        }
-        .chip-row { margin: 0.25rem 0 0.5rem 0; }
-        .note-box {
-            border:1px solid #f2a7bc; background:#fff5f8; padding:0.75rem; border-radius:8px;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
     st.subheader("Conclusion & next steps")
 
-    # Defensive copies / coercions
+    # Coercions (cached)
     df_screening = _coerce_year(df_screening)
     df_mortality = _coerce_year(df_mortality)
     df_exam_income = _coerce_year(df_exam_income)
+    df_screening, df_mortality, df_exam_income = (
+        _categorize(d) for d in (df_screening, df_mortality, df_exam_income)
+    )
+    df_mortality = _flag_under50(df_mortality)
 
     # Sidebar filters
     with st.sidebar:
         st.markdown("### Conclusion filters")
 
-        # Countries universe
-        all_countries = sorted(
-            pd.Index(
-                list(
-                    set(
-                        (df_screening["country"].dropna().unique().tolist() if "country" in df_screening.columns else [])
-                        + (df_mortality["country"].dropna().unique().tolist() if "country" in df_mortality.columns else [])
-                        + (df_exam_income["country"].dropna().unique().tolist() if "country" in df_exam_income.columns else [])
-                    )
-                )
-            ).tolist()
-        )
+        # Countries universe (cached: invariant for a given dataset)
+        all_countries = _all_countries(df_screening, df_mortality, df_exam_income)
         default_sel = all_countries[:6]
 
         countries = st.multiselect(
@@ -145,21 +403,19 @@ def render_conclusion(
             key="concl_countries",
         )
 
-        y_min, y_max = _year_bounds([df_screening, df_mortality, df_exam_income])
+        y_min, y_max = _year_bounds((df_screening, df_mortality, df_exam_income))
         if y_min is not None and y_max is not None:
             y0, y1 = st.slider("Year range", int(y_min), int(y_max), (int(y_min), int(y_max)), key="concl_years")
         else:
             y0, y1 = None, None
             st.info("No year information in the loaded tables.")
 
-    # Apply filters
-    scr_f = _filter_countries(df_screening, countries)
-    mort_f = _filter_countries(df_mortality, countries)
-    exam_f = _filter_countries(df_exam_income, countries)
-
-    scr_f = _filter_years(scr_f, y0, y1)
-    mort_f = _filter_years(mort_f, y0, y1)
-    exam_f = _filter_years(exam_f, y0, y1)
+    # Apply filters (cached per filter combination)
+    fc = tuple(countries)
+    scr_f = apply_filters(df_screening, fc, y0, y1)
+    mort_f = apply_filters(df_mortality, fc, y0, y1)
+    exam_f = apply_filters(df_exam_income, fc, y0, y1)
+    kpi = _compute_kpis(scr_f, mort_f, exam_f)
 
     # Chips
     if countries or (y0 is not None and y1 is not None):
@@ -169,89 +425,21 @@ def render_conclusion(
 
     # ---------------- KPIs (from filtered slice) ----------------
     k1, k2, k3 = st.columns(3)
-
-    # KPI 1: Screening median latest and delta vs first
-    scr_val, scr_delta = "-", ""
-    scr_first, scr_last = None, None
-    if not scr_f.empty and {"screening_rate", "year"}.issubset(scr_f.columns):
-        ys = scr_f["year"].dropna()
-        if not ys.empty:
-            y_last, y_first = int(ys.max()), int(ys.min())
-            latest = scr_f[scr_f["year"].eq(y_last)]["screening_rate"].median()
-            base = scr_f[scr_f["year"].eq(y_first)]["screening_rate"].median()
-            scr_first, scr_last = base, latest
-            if pd.notna(latest):
-                scr_val = f"{latest:.1f}"
-            if pd.notna(latest) and pd.notna(base):
-                scr_delta = f"{(latest - base):+,.1f} vs {y_first}"
-    k1.metric("Organized screening median (latest)", scr_val, scr_delta)
-
-    # KPI 2: Mortality under 50 median latest and delta vs first (fallback to TOTAL if needed)
-    mort_val, mort_delta = "-", ""
-    mort_first, mort_last = None, None
-    mort_sub = _mortality_under50(mort_f)
-    if mort_sub is not None and not mort_sub.empty and {"mortality_rate", "year"}.issubset(mort_sub.columns):
-        # prefer explicit under-50 rows; else use what's available
-        explicit = mort_sub[mort_sub.get("age", "").astype(str) != "TOTAL"] if "age" in mort_sub.columns else mort_sub
-        muse = explicit if not explicit.empty else mort_sub
-        ys = muse["year"].dropna()
-        if not ys.empty:
-            y_last, y_first = int(ys.max()), int(ys.min())
-            latest = muse[muse["year"].eq(y_last)]["mortality_rate"].median()
-            base = muse[muse["year"].eq(y_first)]["mortality_rate"].median()
-            mort_first, mort_last = base, latest
-            if pd.notna(latest):
-                mort_val = f"{latest:.1f}"
-            if pd.notna(latest) and pd.notna(base):
-                mort_delta = f"{(latest - base):+,.1f} vs {y_first}"
-    k2.metric("Mortality median (under 50 preferred, latest)", mort_val, mort_delta)
-
-    # KPI 3: Income gap Q5 − Q1 (under 50, latest survey year)
-    gap_val, gap_note = "-", ""
-    gap_year = None
-    if not exam_f.empty and {"income_quintile", "exam_rate", "year"}.issubset(exam_f.columns):
-        # Canonicalize quintiles quickly if needed
-        qcol = exam_f["income_quintile"].astype(str).str.upper()
-        ei = exam_f.copy()
-        ei.loc[qcol.str.match(r"^QU([1-5])$"), "income_quintile"] = "Q" + qcol.str.extract(r"^QU([1-5])$")[0]
-        ys = ei["year"].dropna()
-        if not ys.empty:
-            y_last = int(ys.max())
-            e_last = ei[ei["year"].eq(y_last)]
-            q5 = e_last[e_last["income_quintile"].eq("Q5")]["exam_rate"].median()
-            q1 = e_last[e_last["income_quintile"].eq("Q1")]["exam_rate"].median()
-            if pd.notna(q5) and pd.notna(q1):
-                gap_val = f"{(q5 - q1):.1f} pp"
-                gap_note = f"Year {y_last}"
-                gap_year = y_last
-    k3.metric("Income gap in last X-ray exam (<50): Q5 − Q1", gap_val, gap_note)
+    k1.metric("Organized screening median (latest)", kpi.scr_val, kpi.scr_delta)
+    k2.metric("Mortality median (under 50 preferred, latest)", kpi.mort_val, kpi.mort_delta)
+    k3.metric("Income gap in last X-ray exam (<50): Q5 − Q1", kpi.gap_val, kpi.gap_note)
 
     st.markdown("---")
 
     # ---------------- Mini-trends (medians across selected countries) ----------------
     c1, c2 = st.columns(2)
 
-    scr_med, mort_med = pd.DataFrame(), pd.DataFrame()
     with c1:
         st.markdown("#### Median screening over time")
-        if not scr_f.empty and {"screening_rate", "year"}.issubset(scr_f.columns):
-            scr_med = (
-                scr_f.groupby("year", as_index=False)["screening_rate"]
-                .median()
-                .dropna(subset=["year", "screening_rate"])
-                .sort_values("year")
-            )
+        if not kpi.scr_by_year.empty:
+            scr_med = kpi.scr_by_year.dropna().reset_index()
             if not scr_med.empty:
-                line = (
-                    alt.Chart(scr_med)
-                    .mark_line(point=True)
-                    .encode(
-                        x=alt.X("year:Q", title="Year"),
-                        y=alt.Y("screening_rate:Q", title="Median screening rate"),
-                        tooltip=[alt.Tooltip("year:Q", format=".0f"), alt.Tooltip("screening_rate:Q", format=".1f")],
-                    )
-                )
-                st.altair_chart(_styled_chart(line), use_container_width=True)
+                st.vega_lite_chart(_trend_spec(scr_med, "screening_rate", "Median screening rate"), use_container_width=True)
             else:
                 st.info("No screening rows in the selected range.")
         else:
@@ -259,28 +447,13 @@ def render_conclusion(
 
     with c2:
         st.markdown("#### Median mortality (under 50 preferred)")
-        m_sub = _mortality_under50(mort_f)
-        if m_sub is not None and not m_sub.empty and {"mortality_rate", "year"}.issubset(m_sub.columns):
-            # prefer explicit under-50
-            explicit = m_sub[m_sub.get("age", "").astype(str) != "TOTAL"] if "age" in m_sub.columns else m_sub
-            muse = explicit if not explicit.empty else m_sub
-            mort_med = (
-                muse.groupby("year", as_index=False)["mortality_rate"]
-                .median()
-                .dropna(subset=["year", "mortality_rate"])
-                .sort_values("year")
-            )
+        if not kpi.mort_by_year.empty:
+            mort_med = kpi.mort_by_year.dropna().reset_index()
             if not mort_med.empty:
-                line = (
-                    alt.Chart(mort_med)
-                    .mark_line(point=True, color="#d62728")
-                    .encode(
-                        x=alt.X("year:Q", title="Year"),
-                        y=alt.Y("mortality_rate:Q", title="Median deaths per 100,000"),
-                        tooltip=[alt.Tooltip("year:Q", format=".0f"), alt.Tooltip("mortality_rate:Q", format=".1f")],
-                    )
+                st.vega_lite_chart(
+                    _trend_spec(mort_med, "mortality_rate", "Median deaths per 100,000", color="#d62728"),
+                    use_container_width=True,
                 )
-                st.altair_chart(_styled_chart(line), use_container_width=True)
             else:
                 st.info("No mortality rows in the selected range.")
         else:
@@ -288,68 +461,7 @@ def render_conclusion(
 
     # ---------------- Sentence-style takeaways ----------------
     st.markdown("### What the data suggests")
-    paragraphs = []
-
-    # Screening sentence
-    if scr_last is not None:
-        # Trend wording from medians if available; otherwise from first/last KPIs
-        scr_trend_phrase = None
-        if not scr_med.empty:
-            first_y, last_y = scr_med["year"].iloc[0], scr_med["year"].iloc[-1]
-            scr_trend_phrase = _trend_wording(
-                float(scr_med["screening_rate"].iloc[0]),
-                float(scr_med["screening_rate"].iloc[-1]),
-                up_word="has increased",
-                down_word="has decreased",
-            )
-        else:
-            scr_trend_phrase = _trend_wording(scr_first, scr_last, up_word="has increased", down_word="has decreased")
-
-        sentence = f"In the selected countries and years, the median **organized screening rate** is **{scr_last:.1f}%** in the latest year. "
-        if scr_trend_phrase:
-            sentence += f"Across the period, it {scr_trend_phrase}."
-        if isinstance(scr_delta, str) and scr_delta:
-            sentence += f" That corresponds to a change of {scr_delta.replace(' vs', ' since')}."
-        paragraphs.append(sentence)
-
-    # Mortality sentence
-    if mort_last is not None:
-        mort_trend_phrase = None
-        if not mort_med.empty:
-            mort_trend_phrase = _trend_wording(
-                float(mort_med["mortality_rate"].iloc[0]) if not mort_med.empty else None,
-                float(mort_med["mortality_rate"].iloc[-1]) if not mort_med.empty else None,
-                up_word="has increased",
-                down_word="has decreased",
-            )
-        else:
-            mort_trend_phrase = _trend_wording(mort_first, mort_last, up_word="has increased", down_word="has decreased")
-
-        sentence = (
-            f"For **mortality** (under 50 preferred when available), the median rate is **{mort_last:.1f} per 100,000** "
-            f"in the latest year."
-        )
-        if mort_trend_phrase:
-            sentence += f" Over the period, it {mort_trend_phrase}."
-        if isinstance(mort_delta, str) and mort_delta:
-            sentence += f" That is {mort_delta.replace(' vs', ' since')}."
-        paragraphs.append(sentence)
-
-    # Income gap sentence
-    if gap_val != "-":
-        sentence = (
-            f"In the **latest survey year**"
-            f"{f' ({gap_year})' if gap_year else ''}, women under 50 in the highest income quintile (Q5) "
-            f"report higher X-ray exam uptake than those in Q1 by about **{gap_val}**."
-        )
-        paragraphs.append(sentence)
-
-    if not paragraphs:
-        paragraphs = [
-            "The current filters do not yield enough comparable data to generate a summary. Try widening the year range or adding more countries."
-        ]
-
-    for p in paragraphs:
+    for p in kpi.paragraphs:
         st.markdown(p)
 
     # ---------------- Caveats & Next steps ----------------
@@ -378,19 +490,19 @@ def render_conclusion(
     col_a, col_b, col_c = st.columns(3)
     with col_a:
         if not scr_f.empty:
-            csv = scr_f.to_csv(index=False).encode("utf-8")
+            csv = _to_csv_bytes(scr_f)
             st.download_button("⬇ Screening (CSV)", data=csv, file_name="screening_filtered.csv", mime="text/csv")
         else:
             st.button("Screening (no data)", disabled=True)
     with col_b:
         if not mort_f.empty:
-            csv = mort_f.to_csv(index=False).encode("utf-8")
+            csv = _to_csv_bytes(mort_f.drop(columns="is_under50", errors="ignore"))
             st.download_button("⬇ Mortality (CSV)", data=csv, file_name="mortality_filtered.csv", mime="text/csv")
         else:
             st.button("Mortality (no data)", disabled=True)
     with col_c:
         if not exam_f.empty:
-            csv = exam_f.to_csv(index=False).encode("utf-8")
+            csv = _to_csv_bytes(exam_f)
             st.download_button("⬇ Exam by income (CSV)", data=csv, file_name="exam_income_filtered.csv", mime="text/csv")
         else:
             st.button("Exam by income (no data)", disabled=True)
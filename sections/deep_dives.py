@@ -2,57 +2,139 @@
 from __future__ import annotations
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
 import re
+from utils.filters import apply_filters
 
 try:
     import plotly.express as px
+    import plotly.io as pio
     _HAS_PLOTLY = True
 except Exception:
     _HAS_PLOTLY = False
 
+try:
+    import polars as pl
+    _HAS_POLARS = True
+except Exception:
+    _HAS_POLARS = False
+
+# -------- Patterns (compiled once) --------
+_RE_QUINT = re.compile(r"^(?:QU?)?([1-5])$")
+_QUINT_WORDS = (("Q1", re.compile(r"LOW|FIRST|BOTTOM")), ("Q2", re.compile(r"SECOND")),
+                ("Q3", re.compile(r"THIRD")), ("Q4", re.compile(r"FOURTH")),
+                ("Q5", re.compile(r"HIGH|FIFTH|TOP")))
+# Match-only patterns (str.contains) use no capture groups: pandas warns on them
+_RE_BAND4049 = re.compile(r"\b(?:40-49|40-44|45-49|Y40-49|Y40-44|Y45-49)\b", re.IGNORECASE)
+_RE_BAND5069 = re.compile(r"\b(?:50-69|50-59|60-69|Y50-69|Y50-59|Y60-69)\b", re.IGNORECASE)
+_RE_TOTAL = re.compile(r"^TOTAL$")
+_RE_U50 = re.compile(r"Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49", re.IGNORECASE)
+_RE_SUB50_AGE = re.compile(r"15-24|25-34|30-39|35-44|40-49|45-49|Y_LT50|Y_GE16_LT50", re.IGNORECASE)
+
 # -------- Normalizers --------
+def _canon_quintile(col: pd.Series) -> pd.Series:
+    """Q1..Q5 labels from codes like QU3 / Q3 / 3 or words (LOW, SECOND, ...); None otherwise."""
+    # Canonicalize the handful of distinct labels, then gather back to rows by code
+    cat = col.astype("category")
+    u = pd.Series(cat.cat.categories.astype(str)).str.upper().str.strip()
+    out = "Q" + u.str.extract(_RE_QUINT, expand=False)
+    # Keyword fallbacks, first match wins
+    for label, pat in _QUINT_WORDS:
+        out = out.mask(out.isna() & u.str.contains(pat, na=False), label)
+    lut = np.append(out.where(out.notna(), None).to_numpy(dtype=object), None)  # code -1 → None
+    return pd.Series(lut[cat.cat.codes.to_numpy()], index=col.index, name=col.name)
+
+def _int_years(d: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows without a usable year and store year as plain int16 (no nullable mask)."""
+    y = pd.to_numeric(d["year"], errors="coerce")
+    d = d.loc[y.notna()].copy()
+    d["year"] = y[y.notna()].astype(np.int16)
+    return d
+
+def _as_category(d: pd.DataFrame, cols) -> pd.DataFrame:
+    """Low-cardinality labels as categoricals: groupby/isin/eq work on integer codes."""
+    for c in cols:
+        if c in d.columns:
+            d[c] = d[c].astype("category")
+    return d
+
+def _by_country_year(d: pd.DataFrame) -> pd.DataFrame:
+    """(country, year) row order, so utils.filters.apply_filters can slice with searchsorted."""
+    if {"country", "year"}.issubset(d.columns):
+        d = d.sort_values(["country", "year"], kind="stable", ignore_index=True)
+    return d
+
+def _project(d: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """Only the columns the tabs read: smaller disk cache and cheaper per-rerun cache copies."""
+    return d[[c for c in cols if c in d.columns]]
+
+def _flag(d: pd.DataFrame, col: str, pat: re.Pattern) -> np.ndarray:
+    """Row mask for a categorical label column: the regex runs once per category, not per row."""
+    if col not in d.columns or d[col].cat.categories.empty:
+        return np.zeros(len(d), dtype=bool)
+    hit = np.asarray(d[col].cat.categories.astype(str).str.contains(pat), dtype=bool)
+    codes = d[col].cat.codes.to_numpy()
+    return (codes >= 0) & hit[codes]  # code -1 (missing) is masked out
+
+def _keep_rows(df: pd.DataFrame, tests: dict) -> pd.DataFrame:
+    """
+    Rows of the raw frame whose upper-cased labels pass every ``tests[col]``, selected
+    before any rename/copy. Each test runs on the distinct labels only.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, test in tests.items():
+        if col in df.columns:
+            codes, labels = pd.factorize(df[col])
+            hit = np.asarray(test(pd.Index(labels.astype(str)).str.upper()), dtype=bool)
+            mask &= (codes >= 0) & hit[codes]  # missing labels never pass
+    return df if mask.all() else df.loc[mask]
+
+# Cached on frame contents: reruns (tab switches, slider moves) reuse the normalized tables,
+# and persist="disk" keeps them across app restarts.
+@st.cache_data(show_spinner=False, persist="disk")
 def _normalize_screening(df: pd.DataFrame | None) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
-    d = df.rename(columns={"geo":"country","TIME_PERIOD":"year","OBS_VALUE":"screening_rate"}).copy()
-    if "icd10" in d.columns: d = d[d["icd10"].astype(str).str.upper().eq("C50")]
-    if "source" in d.columns: d = d[d["source"].astype(str).str.upper().eq("PRG")]
-    if "year" in d.columns: d["year"] = pd.to_numeric(d["year"], errors="coerce").astype("Int64")
-    if "screening_rate" in d.columns: d["screening_rate"] = pd.to_numeric(d["screening_rate"], errors="coerce")
-    return d
+    d = _keep_rows(df, {"icd10": lambda u: u == "C50", "source": lambda u: u == "PRG"})
+    d = d.rename(columns={"geo":"country","TIME_PERIOD":"year","OBS_VALUE":"screening_rate"})
+    if "year" in d.columns: d = _int_years(d)
+    if "screening_rate" in d.columns: d["screening_rate"] = pd.to_numeric(d["screening_rate"], errors="coerce").astype(np.float64)
+    d = _as_category(d, ["country", "age"])
+    # Age-band masks computed once here instead of per tab / per rerun
+    d["_is_band4049"] = _flag(d, "age", _RE_BAND4049)
+    d["_is_band5069"] = _flag(d, "age", _RE_BAND5069)
+    return _by_country_year(_project(d, ["country","year","age","screening_rate","_is_band4049","_is_band5069"]))
 
+@st.cache_data(show_spinner=False, persist="disk")
 def _normalize_mortality(df: pd.DataFrame | None) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
-    d = df.rename(columns={"geo":"country","TIME_PERIOD":"year","OBS_VALUE":"mortality_rate"}).copy()
-    if "sex" in d.columns: d = d[d["sex"].astype(str).str.upper().str.contains("F", na=False)]
-    if "icd10" in d.columns: d = d[d["icd10"].astype(str).str.upper().str.contains("C50", na=False)]
-    if "year" in d.columns: d["year"] = pd.to_numeric(d["year"], errors="coerce").astype("Int64")
-    if "mortality_rate" in d.columns: d["mortality_rate"] = pd.to_numeric(d["mortality_rate"], errors="coerce")
-    return d
+    d = _keep_rows(df, {"sex": lambda u: u.str.contains("F"), "icd10": lambda u: u.str.contains("C50")})
+    d = d.rename(columns={"geo":"country","TIME_PERIOD":"year","OBS_VALUE":"mortality_rate"})
+    if "year" in d.columns: d = _int_years(d)
+    if "mortality_rate" in d.columns: d["mortality_rate"] = pd.to_numeric(d["mortality_rate"], errors="coerce").astype(np.float64)
+    d = _as_category(d, ["country", "age"])
+    d["_is_u50"] = _flag(d, "age", _RE_U50)
+    d["_is_total"] = _flag(d, "age", _RE_TOTAL)
+    return _by_country_year(_project(d, ["country","year","age","mortality_rate","_is_u50","_is_total"]))
 
+@st.cache_data(show_spinner=False, persist="disk")
 def _normalize_income(df: pd.DataFrame | None) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
     d = df.rename(columns={"geo":"country","TIME_PERIOD":"year","OBS_VALUE":"exam_rate",
-                           "quant_inc":"income_quintile","age":"age_group"}).copy()
-    def _canon_quintile(v):
-        if pd.isna(v): return None
-        s = str(v).upper().strip()
-        m = re.match(r"^Q(U)?([1-5])$", s)
-        if m: return f"Q{m.group(2)}"
-        if re.fullmatch(r"[1-5]", s): return f"Q{s}"
-        if "LOW" in s or "FIRST" in s or "BOTTOM" in s: return "Q1"
-        if "SECOND" in s: return "Q2"
-        if "THIRD" in s: return "Q3"
-        if "FOURTH" in s: return "Q4"
-        if "HIGH" in s or "FIFTH" in s or "TOP" in s: return "Q5"
-        return None
-    if "income_quintile" in d.columns: d["income_quintile"] = d["income_quintile"].apply(_canon_quintile)
-    if "year" in d.columns: d["year"] = pd.to_numeric(d["year"], errors="coerce").astype("Int64")
-    if "exam_rate" in d.columns: d["exam_rate"] = pd.to_numeric(d["exam_rate"], errors="coerce")
-    return d
+                           "quant_inc":"income_quintile","age":"age_group"})
+    if "income_quintile" in d.columns: d["income_quintile"] = _canon_quintile(d["income_quintile"])
+    if "year" in d.columns: d = _int_years(d)
+    if "exam_rate" in d.columns: d["exam_rate"] = pd.to_numeric(d["exam_rate"], errors="coerce").astype(np.float64)
+    d = _as_category(d, ["country", "income_quintile", "age_group"])
+    if "age_group" in d.columns:
+        # Display order (shortest label first) fixed once here, reused by the Tab 3 heatmap
+        order = sorted(d["age_group"].cat.categories, key=lambda s: (len(str(s)), str(s)))
+        d["age_group"] = d["age_group"].cat.reorder_categories(order, ordered=True)
+    d["_is_sub50_age"] = _flag(d, "age_group", _RE_SUB50_AGE)
+    return _by_country_year(_project(d, ["country","year","age_group","income_quintile","exam_rate","_is_sub50_age"]))
 
 # ISO-2 → ISO-3 for maps
 _ISO2_TO_ISO3 = {
@@ -62,6 +144,11 @@ _ISO2_TO_ISO3 = {
     "CH":"CHE","UK":"GBR","GB":"GBR","AL":"ALB","BA":"BIH","ME":"MNE","MK":"MKD","RS":"SRB","MD":"MDA","UA":"UKR","BY":"BLR"
 }
 
+@st.cache_data(show_spinner=False)
+def _iso3_for(countries: tuple[str, ...]) -> np.ndarray:
+    """ISO3 per country code, plus a trailing None slot that categorical code -1 (missing) lands on."""
+    return np.array([_ISO2_TO_ISO3.get(c, c) for c in countries] + [None], dtype=object)
+
 def _styled(chart: alt.Chart, title: str = "", height: int | None = None):
     base = chart.properties(title=title, width="container")
     if height:
@@ -72,15 +159,466 @@ def _styled(chart: alt.Chart, title: str = "", height: int | None = None):
             .configure_axis(grid=False, domainColor="#f3a1c0", labelColor="#333", titleColor="#333")
             .configure_legend(titleColor="#333", labelColor="#333"))
 
+# Raw Vega-Lite for the line charts: plain dicts skip Altair's schema validation /
+# to_dict on every rerun. Same look as _styled; templates are never mutated.
+_VL_CONFIG = {
+    "view": {"stroke": "#e6e6e6", "strokeWidth": 1},
+    "title": {"anchor": "start", "fontSize": 14, "color": "#1e1e1e", "fontWeight": "bold"},
+    "axis": {"grid": False, "domainColor": "#f3a1c0", "labelColor": "#333", "titleColor": "#333"},
+    "legend": {"titleColor": "#333", "labelColor": "#333"},
+}
+_X_YEAR = {"field": "year", "type": "ordinal", "title": "Year"}
+_BAND_LINE_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": _X_YEAR,
+        "y": {"field": "screening_rate", "aggregate": "median", "type": "quantitative", "title": "Organized screening rate (%)"},
+        "color": {"field": "band", "type": "nominal", "title": "Age band"},
+        "detail": {"field": "country", "type": "nominal"},
+        "tooltip": [{"field": "country", "type": "nominal"}, {"field": "band", "type": "nominal"}, {"field": "year", "type": "ordinal"},
+                    {"field": "screening_rate", "aggregate": "median", "type": "quantitative", "title": "screening_rate", "format": ".1f"}],
+    },
+}
+_COUNTRY_LINE_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": _X_YEAR,
+        "y": {"field": "screening_rate", "aggregate": "median", "type": "quantitative", "title": "Organized screening rate (%)"},
+        "color": {"field": "country", "type": "nominal", "title": "Country"},
+        "tooltip": [{"field": "country", "type": "nominal"}, {"field": "year", "type": "ordinal"},
+                    {"field": "screening_rate", "aggregate": "median", "type": "quantitative", "title": "screening_rate", "format": ".1f"}],
+    },
+}
+_SHARE_U50_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "params": [{"name": "sel", "select": {"type": "point", "fields": ["country"]}, "bind": "legend"}],
+    "encoding": {
+        "x": _X_YEAR,
+        "y": {"field": "share_u50", "type": "quantitative", "title": "Share under 50 (%)"},
+        "color": {"condition": {"param": "sel", "field": "country", "type": "nominal", "title": "Country"}, "value": "#d3d3d3"},
+        "tooltip": [{"field": "country", "type": "nominal"}, {"field": "year", "type": "ordinal"},
+                    {"field": "share_u50", "type": "quantitative", "format": ".1f"}],
+    },
+}
+
+def _vl(spec: dict, title: str = "", height: int | None = None) -> dict:
+    """Template + title/size/config, as a new top-level dict (the template is shared)."""
+    out = {**spec, "title": title, "width": "container", "config": _VL_CONFIG}
+    if height:
+        out["height"] = height
+    return out
+
+# -------- Group aggregation --------
+def _seg_median(seg: np.ndarray) -> float:
+    seg = seg[~np.isnan(seg)]
+    return float(np.median(seg)) if seg.size else np.nan  # np.median partitions, no full sort
+
+def _country_year_agg(d: pd.DataFrame, col: str, how: str = "mean") -> pd.DataFrame:
+    """
+    Same rows as d.groupby(["country","year"], as_index=False, observed=True)[col].<how>(),
+    computed on integer (country code, year) keys: np.add.reduceat for means,
+    one partition-based median per segment.
+    """
+    if d.empty or not isinstance(d["country"].dtype, pd.CategoricalDtype):
+        return getattr(d.groupby(["country","year"], as_index=False, observed=True)[col], how)()
+    codes = d["country"].cat.codes.to_numpy(dtype=np.int64)
+    years = d["year"].to_numpy(dtype=np.int64)
+    vals = d[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = codes >= 0
+    codes, years, vals = codes[ok], years[ok], vals[ok]
+    if codes.size == 0:
+        return getattr(d.groupby(["country","year"], as_index=False, observed=True)[col], how)()
+    y_lo = int(years.min())
+    span = int(years.max()) - y_lo + 1
+    keys = codes * span + (years - y_lo)
+    order = np.argsort(keys, kind="stable")
+    keys, vals = keys[order], vals[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(keys)) + 1]
+    if how == "mean":
+        finite = ~np.isnan(vals)
+        sums = np.add.reduceat(np.where(finite, vals, 0.0), starts)
+        counts = np.add.reduceat(finite.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = sums / counts  # all-NaN groups give 0/0 = NaN, like pandas
+    else:
+        bounds = np.r_[starts, vals.size]
+        out = np.array([_seg_median(vals[a:b]) for a, b in zip(bounds[:-1], bounds[1:])])
+    k = keys[starts]
+    return pd.DataFrame({
+        "country": pd.Categorical.from_codes(k // span, dtype=d["country"].dtype),
+        "year": (k % span + y_lo).astype(d["year"].dtype),
+        col: out,
+    })
+
+# -------- Country × year aggregates (cached once per normalized table) --------
+# The correlation panel and the maps slice these small frames instead of rescanning rows.
+@st.cache_data(show_spinner=False)
+def _scr_by_year(scr: pd.DataFrame) -> pd.DataFrame:
+    """Median screening rate per (country, year)."""
+    return _country_year_agg(scr, "screening_rate", "median")
+
+@st.cache_data(show_spinner=False)
+def _mort_by_year(mort: pd.DataFrame) -> pd.DataFrame:
+    """Under-50 / TOTAL mortality means per (country, year) and share_u50; NaN where a side is missing."""
+    if _HAS_POLARS:
+        # Multi-threaded polars group_by; from_pandas turns NaN into null, which mean() skips like pandas
+        u50, total = pl.col("_is_u50"), pl.col("_is_total")
+        return (pl.from_pandas(mort[["country","year","mortality_rate","_is_u50","_is_total"]]).lazy()
+                    .filter(u50 | total)
+                    .group_by(["country","year"], maintain_order=True)
+                    .agg(pl.col("mortality_rate").filter(u50).mean().alias("mort_u50"),
+                         pl.col("mortality_rate").filter(total).mean().alias("mort_total"))
+                    .with_columns((pl.col("mort_u50") / pl.col("mort_total") * 100).alias("share_u50"))
+                    .collect().to_pandas())
+    is_u50, is_total = mort["_is_u50"].to_numpy(), mort["_is_total"].to_numpy()
+    # One groupby: each row feeds the under-50 column, the TOTAL column, or neither
+    v = mort["mortality_rate"].to_numpy(dtype=np.float64, na_value=np.nan)
+    g = (pd.DataFrame({"country": mort["country"], "year": mort["year"],
+                       "mort_u50": np.where(is_u50, v, np.nan), "mort_total": np.where(is_total, v, np.nan)})
+           .loc[is_u50 | is_total]
+           .groupby(["country","year"], observed=True, sort=False)[["mort_u50","mort_total"]].mean())
+    g["share_u50"] = (g["mort_u50"] / g["mort_total"]) * 100
+    return g.reset_index()
+
+@st.cache_data(show_spinner=False)
+def _gap_by_year(inc: pd.DataFrame) -> pd.DataFrame:
+    """Income gap Q5 − Q1 (sub-50 ages) per (country, survey year); pairs missing a side are dropped."""
+    if _HAS_POLARS:
+        # Both quintile medians in one polars aggregation, no unstack
+        q = pl.col("income_quintile").cast(pl.Utf8)
+        return (pl.from_pandas(inc[["country","year","income_quintile","exam_rate","_is_sub50_age"]]).lazy()
+                  .filter(pl.col("_is_sub50_age") & q.is_in(["Q1","Q5"]))
+                  .group_by(["country","year"], maintain_order=True)
+                  .agg((pl.col("exam_rate").filter(q == "Q5").median()
+                        - pl.col("exam_rate").filter(q == "Q1").median()).alias("income_gap"))
+                  .drop_nulls("income_gap")
+                  .collect().to_pandas())
+    sub50 = inc[inc["_is_sub50_age"] & inc["income_quintile"].isin(["Q1","Q5"])]
+    if sub50.empty:
+        return pd.DataFrame(columns=["country", "year", "income_gap"])
+    q = (sub50.groupby(["country","year","income_quintile"], observed=True, sort=False)["exam_rate"].median()
+              .unstack("income_quintile").reindex(columns=["Q1","Q5"]))
+    return q["Q5"].sub(q["Q1"]).rename("income_gap").dropna().reset_index()
+
+@st.cache_data(show_spinner=False)
+def _years(df: pd.DataFrame) -> np.ndarray:
+    """Sorted distinct years of a normalized table (years are non-null there)."""
+    return np.unique(df["year"].to_numpy())
+
+@st.cache_data(show_spinner=False)
+def _panel_for_year(scr: pd.DataFrame, mort: pd.DataFrame, inc: pd.DataFrame, y: int) -> pd.DataFrame:
+    """Country-level panel for one year (cached per year, so slider revisits are lookups)."""
+    def _at(agg: pd.DataFrame) -> pd.DataFrame:
+        return agg[agg["year"].eq(y)]
+    s_agg = pd.DataFrame() if scr.empty else _at(_scr_by_year(scr))
+    m_agg = pd.DataFrame() if mort.empty else _at(_mort_by_year(mort))
+    # income gap from the latest survey year <= y (cached sorted year list)
+    g = pd.DataFrame()
+    if not inc.empty:
+        svy_years = _years(inc)
+        i = int(np.searchsorted(svy_years, y, side="right"))
+        if i > 0:
+            last_svy = int(svy_years[i - 1])
+            gap = _gap_by_year(inc)
+            g = gap[gap["year"].eq(last_svy)].drop(columns="year").assign(svy_year=last_svy)
+    # Index-aligned joins on (country, year) instead of chained merges
+    parts = [a.set_index(["country","year"]) for a in (s_agg, m_agg) if not a.empty]
+    if not parts:
+        return pd.DataFrame()
+    panel = parts[0] if len(parts) == 1 else parts[0].join(parts[1], how="outer")
+    panel = panel.reset_index()
+    if not g.empty: panel = panel.join(g.set_index("country"), on="country")
+    return panel.rename(columns={"year":"panel_year"})
+
+def _corr_long(panel: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """
+    Pearson r between ``cols`` in long form (index, variable, corr), rounded to 2 dp.
+    Same pairwise-complete result as panel[cols].corr() + melt, via np.corrcoef.
+    """
+    arr = panel[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = ~np.isnan(arr)
+    k = len(cols)
+    r = np.full((k, k), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if ok.all() and len(arr) >= 2:
+            r = np.corrcoef(arr, rowvar=False)
+        else:
+            # Some gaps: each pair uses the rows where both are present
+            for i in range(k):
+                for j in range(i, k):
+                    m = ok[:, i] & ok[:, j]
+                    if m.sum() >= 2:
+                        r[i, j] = r[j, i] = np.corrcoef(arr[m, i], arr[m, j])[0, 1]
+    return pd.DataFrame({"index": np.tile(cols, k), "variable": np.repeat(cols, k), "corr": r.T.ravel().round(2)})
+
+_MAP_METRICS = ("Screening (%)", "Mortality under 50 (per 100k)", "Income gap Q5−Q1 (<50, pp)")
+
+@st.cache_data(show_spinner=False)
+def _map_panel(scr: pd.DataFrame, mort: pd.DataFrame, inc: pd.DataFrame) -> pd.DataFrame:
+    """
+    Long (country, year, value, metric, iso3) panel behind the maps.
+    Depends only on the normalized tables, so metric / map-type / year changes reuse it.
+    """
+    parts = []  # (metric code, frame with country / year / value)
+    if not scr.empty:
+        parts.append((0, _scr_by_year(scr).rename(columns={"screening_rate":"value"})))
+    if not mort.empty:
+        under = _mort_by_year(mort).dropna(subset=["mort_u50"])
+        if not under.empty:
+            parts.append((1, under[["country","year","mort_u50"]].rename(columns={"mort_u50":"value"})))
+    if not inc.empty:
+        gap = _gap_by_year(inc)
+        if not gap.empty:
+            parts.append((2, gap.rename(columns={"income_gap":"value"})))
+    if not parts:
+        return pd.DataFrame()
+    # Fill pre-sized columns slice by slice instead of concatenating intermediate frames
+    n = sum(len(f) for _, f in parts)
+    country = np.empty(n, dtype=object)
+    year = np.empty(n, dtype=np.int16)
+    value = np.empty(n, dtype=np.float64)
+    metric = np.empty(n, dtype=np.int8)
+    off = 0
+    for k, f in parts:
+        sl = slice(off, off + len(f))
+        country[sl] = f["country"].to_numpy(dtype=object)
+        year[sl] = f["year"].to_numpy()
+        value[sl] = f["value"].to_numpy(dtype=np.float64, na_value=np.nan)
+        metric[sl] = k
+        off += len(f)
+    panel = pd.DataFrame({"country": country, "year": year, "value": value,
+                          "metric": pd.Categorical.from_codes(metric, categories=_MAP_METRICS)})
+    # Look up the few distinct country codes once, then gather by categorical code
+    c = panel["country"].astype("category")
+    panel["iso3"] = _iso3_for(tuple(c.cat.categories))[c.cat.codes.to_numpy()]
+    return panel
+
+# -------- Per-tab aggregates (cached on the filtered table) --------
+@st.cache_data(show_spinner=False)
+def _screening_bands(scr_f: pd.DataFrame) -> pd.DataFrame:
+    """(country, year, band, screening_rate) rows in the 40–49 / 50–69 bands."""
+    # Band code in one np.select: 50–69 wins where both match, -1 = no band.
+    # Only the four charted columns are built.
+    code = np.select([scr_f["_is_band5069"].to_numpy(), scr_f["_is_band4049"].to_numpy()], [1, 0], default=-1)
+    keep = code >= 0
+    return pd.DataFrame({
+        "country": scr_f["country"].to_numpy()[keep],
+        "year": scr_f["year"].to_numpy()[keep],
+        "band": pd.Categorical.from_codes(code[keep], categories=["40–49", "50–69"], ordered=True),
+        "screening_rate": scr_f["screening_rate"].to_numpy()[keep],
+    })
+
+@st.cache_data(show_spinner=False)
+def _share_u50(mort_f: pd.DataFrame) -> pd.DataFrame | None:
+    """Under-50 and TOTAL mortality per (country, year) with their ratio; None if either is missing."""
+    if not mort_f["_is_u50"].any() or not mort_f["_is_total"].any():
+        return None
+    return _mort_by_year(mort_f).dropna(subset=["mort_u50","mort_total"]).reset_index(drop=True)
+
+def _year_bounds(*dfs: pd.DataFrame) -> tuple[int | None, int | None]:
+    """Min/max year over the tables: two reductions per frame, no Python lists."""
+    lows = [d["year"].min() for d in dfs if not d.empty and "year" in d.columns]
+    highs = [d["year"].max() for d in dfs if not d.empty and "year" in d.columns]
+    if not lows:
+        return None, None
+    return int(min(lows)), int(max(highs))
+
+def _downsample(df: pd.DataFrame, keys: list[str], col: str, max_points: int = 4000) -> pd.DataFrame:
+    """
+    Raw rows while they are few; past ``max_points`` one median per ``keys`` group.
+    The charts take the median per group anyway, so the plot is unchanged, only the payload shrinks.
+    """
+    if len(df) <= max_points:
+        return df
+    return df.groupby(keys, observed=True, sort=False)[col].median().reset_index()
+
+# -------- Altair specs (cached: validation + to_dict run once per distinct input) --------
+_HEATMAP_COLS = ["country", "year", "age_group", "income_quintile", "exam_rate"]
+
+@st.cache_data(show_spinner=False)
+def _heatmap_spec(ec: pd.DataFrame, age_order: tuple[str, ...]) -> dict:
+    heat = alt.Chart(ec).mark_rect().encode(
+        x=alt.X("income_quintile:N", sort=["Q1","Q2","Q3","Q4","Q5"], title="Income quintile"),
+        y=alt.Y("age_group:N", sort=list(age_order), title="Age group"),
+        color=alt.Color("exam_rate:Q", title="Exam rate (%)", scale=alt.Scale(scheme="reds")),
+        tooltip=["country","income_quintile","age_group",alt.Tooltip("exam_rate:Q", format=".1f")]
+    )
+    return _styled(heat, height=max(260, 18 * max(8, len(age_order)))).to_dict()
+
+_OUTCOME_TITLES = {"mort_u50":"Mortality under 50 (per 100k)","share_u50":"Share under 50 (%)","mort_total":"Mortality total (per 100k)"}
+
+@st.cache_data(show_spinner=False)
+def _scatter_spec(panel: pd.DataFrame, yaxis: str, corr_year: int) -> dict:
+    scatter = alt.Chart(panel.dropna(subset=["screening_rate", yaxis])).mark_circle(size=90).encode(
+        x=alt.X("screening_rate:Q", title="Organized screening rate (%)"),
+        y=alt.Y(f"{yaxis}:Q", title=_OUTCOME_TITLES[yaxis]),
+        color=alt.Color("income_gap:Q", title="Income gap (pp)", scale=alt.Scale(scheme="redpurple")),
+        tooltip=["country","panel_year",alt.Tooltip("screening_rate:Q", format=".1f"),alt.Tooltip(f"{yaxis}:Q", format=".1f"),alt.Tooltip("income_gap:Q", format=".1f")]
+    )
+    return _styled(scatter, title=f"Correlation {corr_year}", height=360).to_dict()
+
+@st.cache_data(show_spinner=False)
+def _corr_matrix_spec(corr: pd.DataFrame) -> dict:
+    heat = alt.Chart(corr).mark_rect().encode(
+        x=alt.X("variable:N", title=""), y=alt.Y("index:N", title=""),
+        color=alt.Color("corr:Q", scale=alt.Scale(scheme="redpurple"), title="r"),
+        tooltip=["index","variable",alt.Tooltip("corr:Q", format=".2f")]
+    )
+    text = alt.Chart(corr).mark_text(fontWeight="bold").encode(x="variable:N", y="index:N", text=alt.Text("corr:Q", format=".2f"))
+    return _styled(heat + text, title="Correlation matrix").to_dict()
+
+@st.cache_data(show_spinner=False)
+def _map_figure_json(panel: pd.DataFrame, metric: str, map_kind: str,
+                     y0: int | None, y1: int | None) -> str | None:
+    """
+    Animated map for one metric, serialized with fig.to_json().
+    Cached on (panel, metric, kind, years): reruns rebuild the figure from JSON
+    instead of redoing the plotly express location join for every frame.
+    """
+    keep = panel["metric"].eq(metric)
+    if y0 is not None and y1 is not None:
+        keep &= panel["year"].between(y0, y1)
+    data = panel[keep].sort_values("year")
+    if data.empty:
+        return None
+    if map_kind == "Choropleth":
+        fig = px.choropleth(
+            data, locations="iso3", color="value", scope="europe",
+            color_continuous_scale="RdPu", animation_frame="year",
+            title=metric
+        )
+    else:
+        fig = px.scatter_geo(
+            data, locations="iso3", size="value", color="value",
+            color_continuous_scale="RdPu", scope="europe",
+            animation_frame="year", title=metric + " — Bubble size encodes value"
+        )
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=40, b=0),
+        coloraxis_colorbar=dict(title=metric.split("(")[0].strip()),
+        paper_bgcolor="white",
+        geo=dict(bgcolor="rgba(0,0,0,0)")
+    )
+    return fig.to_json()
+
+# -------- Tabs --------
+# Tabs with their own widgets are fragments: changing a widget reruns that tab only,
+# not the whole page. st.fragment is the 1.37+ name of st.experimental_fragment.
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+# ===== Tab 1: screening bands =====
+def _tab_bands(scr_f: pd.DataFrame) -> None:
+    st.markdown("#### Are we screening enough — and early enough?")
+    if not scr_f.empty:
+        if "age" in scr_f.columns:
+            s = _screening_bands(scr_f)
+            if not s.empty:
+                # Median per (country, band, year) is computed by Vega-Lite from the raw rows
+                st.vega_lite_chart(_downsample(s, ["country","year","band"], "screening_rate"),
+                                   _vl(_BAND_LINE_SPEC, height=360), use_container_width=True)
+            else:
+                st.info("Age-specific screening bands not available in this selection.")
+        else:
+            # Cached (country, year) medians: one point per mark, however many raw rows
+            st.vega_lite_chart(_scr_by_year(scr_f), _vl(_COUNTRY_LINE_SPEC, height=360), use_container_width=True)
+    else:
+        st.info("No screening data for current filters.")
+
+# ===== Tab 2: burden shift =====
+def _tab_burden(mort_f: pd.DataFrame) -> None:
+    st.markdown("#### Is the burden shifting to younger women?")
+    if not mort_f.empty and {"mortality_rate","age","year","country"}.issubset(mort_f.columns):
+        g = _share_u50(mort_f)
+        if g is not None:
+            st.vega_lite_chart(g, _vl(_SHARE_U50_SPEC, height=360), use_container_width=True)
+        else:
+            st.info("Need both under-50 and TOTAL mortality to compute the share.")
+    else:
+        st.info("Mortality data incomplete for this analysis.")
+
+# ===== Tab 3: inequality =====
+@_fragment
+def _tab_inequality(inc_f: pd.DataFrame, sel_countries: list[str]) -> None:
+    st.markdown("#### Who gets screened — and who doesn’t?")
+    if not inc_f.empty and {"country","year","age_group","income_quintile","exam_rate"}.issubset(inc_f.columns):
+        last_y = int(_years(inc_f)[-1])
+        e = inc_f[inc_f["year"].eq(last_y)]
+        st.caption(f"Latest survey year available: {last_y}")
+        default_country = (sel_countries[0] if sel_countries else e["country"].iloc[0])
+        # Categories are already deduped and sorted: one pass, no Python-side sort
+        opts = e["country"].cat.remove_unused_categories().cat.categories.tolist()
+        c_heat = st.selectbox("Choose country", opts,
+                              index=opts.index(default_country) if default_country in opts else 0)
+        ec = e[e["country"].eq(c_heat)]
+        if not ec.empty:
+            age_order = list(ec["age_group"].cat.remove_unused_categories().cat.categories)
+            # Only the charted columns reach the spec: helper flags such as _is_sub50_age stay server-side
+            st.vega_lite_chart(_heatmap_spec(ec[_HEATMAP_COLS], tuple(age_order)), use_container_width=True)
+    else:
+        st.info("Income × age table is missing required columns.")
+
+# ===== Tab 4: correlation lab =====
+@_fragment
+def _tab_correlation(scr: pd.DataFrame, mort: pd.DataFrame, inc: pd.DataFrame) -> None:
+    st.markdown("#### Correlation Lab")
+    # pick a correlation year inside the tab (default = latest overall)
+    lo, hi = _year_bounds(scr, mort)
+    if lo is None:
+        st.info("No year available for correlation.")
+    else:
+        # Inside a form the slider only reruns the app on "Update", not on every drag step
+        with st.form("corr_form", border=False):
+            corr_year = st.slider("Correlation year", lo, hi, hi)
+            st.form_submit_button("Update")
+        panel = _panel_for_year(scr, mort, inc, int(corr_year))
+        if panel is None or panel.empty:
+            st.info("Not enough overlapping data to compute correlations.")
+        else:
+            yaxis = st.selectbox("Outcome", ["mort_u50","share_u50","mort_total"], index=0)
+            st.vega_lite_chart(_scatter_spec(panel, yaxis, int(corr_year)), use_container_width=True)
+
+            # Matrix
+            num_cols = [c for c in ["screening_rate","mort_u50","mort_total","share_u50","income_gap"] if c in panel.columns]
+            if len(num_cols) >= 2:
+                corr = _corr_long(panel, num_cols)
+                st.vega_lite_chart(_corr_matrix_spec(corr), use_container_width=True)
+
+# ===== Tab 5: Europe maps =====
+@_fragment
+def _tab_maps(scr: pd.DataFrame, mort: pd.DataFrame, inc: pd.DataFrame, y0: int | None, y1: int | None) -> None:
+    st.markdown("#### Europe Maps")
+    if not _HAS_PLOTLY:
+        st.warning("Plotly is required for map animation. pip install plotly")
+    else:
+        panel = _map_panel(scr, mort, inc)
+        if panel.empty:
+            st.info("No data available for maps.")
+        else:
+            metric = st.selectbox("Metric", list(_MAP_METRICS), index=0)
+            map_kind = st.radio("Map type", ["Choropleth", "Bubble"], index=0, horizontal=True)
+            fig_json = _map_figure_json(panel, metric, map_kind, y0, y1)
+            if fig_json is None:
+                st.info("Metric not available for current selection.")
+            else:
+                st.plotly_chart(pio.from_json(fig_json), use_container_width=True)
+
+_VIEWS = (
+    "Screening: Early vs Recommended",
+    "Burden shift: Under-50",
+    "Inequality: Income × Age",
+    "Correlation Lab",
+    "Europe Maps",
+)
+
 def render_deep_dives(df_screening: pd.DataFrame | None = None,
                       df_mortality: pd.DataFrame | None = None,
                       df_exam_income: pd.DataFrame | None = None) -> None:
     st.subheader("Deep Dives")
-    st.caption("Global filters live in the sidebar. Each tab adds its own lightweight controls.")
+    st.caption("Global filters live in the sidebar. Each view adds its own lightweight controls.")
 
-    scr = _normalize_screening(df_screening)
-    mort = _normalize_mortality(df_mortality)
-    inc  = _normalize_income(df_exam_income)
+    # A radio instead of st.tabs: st.tabs runs every tab body on each rerun,
+    # here only the selected view normalizes, filters and charts its tables.
+    view = st.radio("View", _VIEWS, horizontal=True, key="deep_dive_view", label_visibility="collapsed")
 
     # ---- read global filters ----
     gf = st.session_state.get("global_filters", {}) or {}
@@ -88,240 +626,27 @@ def render_deep_dives(df_screening: pd.DataFrame | None = None,
     y0, y1 = gf.get("y0"), gf.get("y1")
 
     def _sub(df):
-        if df is None or df.empty: return df
-        d = df.copy()
-        if "year" in d.columns and y0 is not None and y1 is not None:
-            d = d[(d["year"] >= y0) & (d["year"] <= y1)]
-        if "country" in d.columns and sel_countries:
-            d = d[d["country"].isin(sel_countries)]
-        return d
-
-    scr_f, mort_f, inc_f = _sub(scr), _sub(mort), _sub(inc)
-
-    t1, t2, t3, t4, t5 = st.tabs([
-        "Screening: Early vs Recommended",
-        "Burden shift: Under-50",
-        "Inequality: Income × Age",
-        "Correlation Lab",
-        "Europe Maps",
-    ])
+        return apply_filters(df, tuple(sel_countries), y0, y1)
 
     # ===== Tab 1: Screening bands =====
-    with t1:
-        st.markdown("#### Are we screening enough — and early enough?")
-        if not scr_f.empty:
-            s = scr_f.copy()
-            if "age" in s.columns:
-                s["age"] = s["age"].astype(str)
-                band4049 = s["age"].str.contains(r"\b(40-49|40-44|45-49|Y40-49|Y40-44|Y45-49)\b", regex=True, case=False)
-                band5069 = s["age"].str.contains(r"\b(50-69|50-59|60-69|Y50-69|Y50-59|Y60-69)\b", regex=True, case=False)
-                s["band"] = None
-                s.loc[band4049, "band"] = "40–49"
-                s.loc[band5069, "band"] = "50–69"
-                s = s.dropna(subset=["band"])
-                if not s.empty:
-                    ts = s.groupby(["country","year","band"], as_index=False)["screening_rate"].median().sort_values(["country","band","year"])
-                    color = alt.Color("band:N", title="Age band")
-                    line = alt.Chart(ts).mark_line(point=True).encode(
-                        x=alt.X("year:O", title="Year"),
-                        y=alt.Y("screening_rate:Q", title="Organized screening rate (%)"),
-                        color=color,
-                        tooltip=["country","band","year",alt.Tooltip("screening_rate:Q", format=".1f")]
-                    )
-                    st.altair_chart(_styled(line, height=360), use_container_width=True)
-                else:
-                    st.info("Age-specific screening bands not available in this selection.")
-            else:
-                ts = scr_f.groupby(["country","year"], as_index=False)["screening_rate"].median().sort_values(["country","year"])
-                line = alt.Chart(ts).mark_line(point=True).encode(
-                    x=alt.X("year:O", title="Year"),
-                    y=alt.Y("screening_rate:Q", title="Organized screening rate (%)"),
-                    color=alt.Color("country:N", title="Country"),
-                    tooltip=["country","year",alt.Tooltip("screening_rate:Q", format=".1f")]
-                )
-                st.altair_chart(_styled(line, height=360), use_container_width=True)
-        else:
-            st.info("No screening data for current filters.")
+    if view == _VIEWS[0]:
+        _tab_bands(_sub(_normalize_screening(df_screening)))
 
     # ===== Tab 2: Burden shift =====
-    with t2:
-        st.markdown("#### Is the burden shifting to younger women?")
-        if not mort_f.empty and {"mortality_rate","age","year","country"}.issubset(mort_f.columns):
-            m = mort_f.copy()
-            m["age"] = m["age"].astype(str)
-            under = m[m["age"].str.contains(r"(Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49)", regex=True, case=False)]
-            total = m[m["age"].eq("TOTAL")]
-            if not under.empty and not total.empty:
-                u = under.groupby(["country","year"], as_index=False)["mortality_rate"].mean().rename(columns={"mortality_rate":"mort_u50"})
-                t = total.groupby(["country","year"], as_index=False)["mortality_rate"].mean().rename(columns={"mortality_rate":"mort_total"})
-                g = pd.merge(u, t, on=["country","year"], how="inner")
-                g["share_u50"] = (g["mort_u50"] / g["mort_total"]) * 100
-                sel = alt.selection_point(fields=["country"], bind="legend")
-                chart = alt.Chart(g).mark_line(point=True).encode(
-                    x=alt.X("year:O", title="Year"),
-                    y=alt.Y("share_u50:Q", title="Share under 50 (%)"),
-                    color=alt.condition(sel, alt.Color("country:N", title="Country"), alt.value("#d3d3d3")),
-                    tooltip=["country","year",alt.Tooltip("share_u50:Q", format=".1f")]
-                ).add_params(sel)
-                st.altair_chart(_styled(chart, height=360), use_container_width=True)
-            else:
-                st.info("Need both under-50 and TOTAL mortality to compute the share.")
-        else:
-            st.info("Mortality data incomplete for this analysis.")
+    elif view == _VIEWS[1]:
+        _tab_burden(_sub(_normalize_mortality(df_mortality)))
 
     # ===== Tab 3: Inequality =====
-    with t3:
-        st.markdown("#### Who gets screened — and who doesn’t?")
-        if not inc_f.empty and {"country","year","age_group","income_quintile","exam_rate"}.issubset(inc_f.columns):
-            last_y = int(inc_f["year"].dropna().max())
-            e = inc_f[inc_f["year"].eq(last_y)].copy()
-            st.caption(f"Latest survey year available: {last_y}")
-            default_country = (sel_countries[0] if sel_countries else e["country"].iloc[0])
-            c_heat = st.selectbox("Choose country", sorted(e["country"].unique().tolist()),
-                                  index=sorted(e["country"].unique()).index(default_country))
-            ec = e[e["country"].eq(c_heat)]
-            if not ec.empty:
-                age_order = sorted(ec["age_group"].astype(str).unique().tolist(), key=lambda s: (len(s), s))
-                heat = alt.Chart(ec).mark_rect().encode(
-                    x=alt.X("income_quintile:N", sort=["Q1","Q2","Q3","Q4","Q5"], title="Income quintile"),
-                    y=alt.Y("age_group:N", sort=age_order, title="Age group"),
-                    color=alt.Color("exam_rate:Q", title="Exam rate (%)", scale=alt.Scale(scheme="reds")),
-                    tooltip=["country","income_quintile","age_group",alt.Tooltip("exam_rate:Q", format=".1f")]
-                )
-                st.altair_chart(_styled(heat, height=max(260, 18 * max(8, len(age_order)))), use_container_width=True)
-        else:
-            st.info("Income × age table is missing required columns.")
-
-    # ===== Tab 4: Correlation Lab =====
-    with t4:
-        st.markdown("#### Correlation Lab")
-        # pick a correlation year inside the tab (default = latest overall)
-        y_candidates = scr["year"].dropna().tolist() + mort["year"].dropna().tolist()
-        if not y_candidates:
-            st.info("No year available for correlation.")
-        else:
-            corr_year = st.slider("Correlation year", int(min(y_candidates)), int(max(y_candidates)), int(max(y_candidates)))
-            def _panel_for_year(y: int) -> pd.DataFrame:
-                # screening
-                if scr.empty: s_agg = pd.DataFrame()
-                else:
-                    if "age" in scr.columns:
-                        s_agg = scr[scr["year"].eq(y)].groupby(["country","year"], as_index=False)["screening_rate"].median()
-                    else:
-                        s_agg = scr[scr["year"].eq(y)][["country","year","screening_rate"]]
-                # mortality
-                if mort.empty: m_agg = pd.DataFrame()
-                else:
-                    m = mort.copy(); m["age"] = m.get("age","").astype(str)
-                    under = m[m["age"].str.contains(r"(Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49)", regex=True, case=False)]
-                    total = m[m["age"].eq("TOTAL")]
-                    u = under[under["year"].eq(y)].groupby(["country","year"], as_index=False)["mortality_rate"].mean().rename(columns={"mortality_rate":"mort_u50"})
-                    t = total[total["year"].eq(y)].groupby(["country","year"], as_index=False)["mortality_rate"].mean().rename(columns={"mortality_rate":"mort_total"})
-                    m_agg = pd.merge(u,t,on=["country","year"], how="outer")
-                    if not m_agg.empty:
-                        m_agg["share_u50"] = (m_agg["mort_u50"] / m_agg["mort_total"]) * 100
-                # income gap (last <= y)
-                if inc.empty: g = pd.DataFrame()
-                else:
-                    e_y = inc[inc["year"].le(y)]
-                    if e_y.empty: g = pd.DataFrame()
-                    else:
-                        last_svy = int(e_y["year"].max())
-                        sub = e_y[e_y["year"].eq(last_svy)]
-                        sub = sub[sub["age_group"].astype(str).str.contains(r"(15-24|25-34|30-39|35-44|40-49|45-49|Y_LT50|Y_GE16_LT50)", regex=True, case=False)]
-                        if sub.empty: g = pd.DataFrame()
-                        else:
-                            g = (sub.pivot_table(index="country", columns="income_quintile", values="exam_rate", aggfunc="median")
-                                     .assign(income_gap=lambda d: d.get("Q5") - d.get("Q1"))
-                                     .reset_index()[["country","income_gap"]])
-                            g["svy_year"] = last_svy
-                panel = s_agg
-                if not m_agg.empty: panel = pd.merge(panel, m_agg, on=["country","year"], how="outer")
-                if not g.empty: panel = pd.merge(panel, g, on="country", how="left")
-                if panel is not None and not panel.empty: panel = panel.rename(columns={"year":"panel_year"})
-                return panel
-            panel = _panel_for_year(int(corr_year))
-            if panel is None or panel.empty:
-                st.info("Not enough overlapping data to compute correlations.")
-            else:
-                yaxis = st.selectbox("Outcome", ["mort_u50","share_u50","mort_total"], index=0)
-                pretty = {"mort_u50":"Mortality under 50 (per 100k)","share_u50":"Share under 50 (%)","mort_total":"Mortality total (per 100k)"}[yaxis]
-                scatter = alt.Chart(panel.dropna(subset=["screening_rate", yaxis])).mark_circle(size=90).encode(
-                    x=alt.X("screening_rate:Q", title="Organized screening rate (%)"),
-                    y=alt.Y(f"{yaxis}:Q", title=pretty),
-                    color=alt.Color("income_gap:Q", title="Income gap (pp)", scale=alt.Scale(scheme="redpurple")),
-                    tooltip=["country","panel_year",alt.Tooltip("screening_rate:Q", format=".1f"),alt.Tooltip(f"{yaxis}:Q", format=".1f"),alt.Tooltip("income_gap:Q", format=".1f")]
-                )
-                st.altair_chart(_styled(scatter, title=f"Correlation {corr_year}", height=360), use_container_width=True)
-
-                # Matrix
-                num_cols = [c for c in ["screening_rate","mort_u50","mort_total","share_u50","income_gap"] if c in panel.columns]
-                if len(num_cols) >= 2:
-                    corr = panel[num_cols].corr().round(2).reset_index().melt("index", var_name="variable", value_name="corr")
-                    heat = alt.Chart(corr).mark_rect().encode(
-                        x=alt.X("variable:N", title=""), y=alt.Y("index:N", title=""),
-                        color=alt.Color("corr:Q", scale=alt.Scale(scheme="redpurple"), title="r"),
-                        tooltip=["index","variable",alt.Tooltip("corr:Q", format=".2f")]
-                    )
-                    text = alt.Chart(corr).mark_text(fontWeight="bold").encode(x="variable:N", y="index:N", text=alt.Text("corr:Q", format=".2f"))
-                    st.altair_chart(_styled(heat + text, title="Correlation matrix"), use_container_width=True)
-
-    # ===== Tab 5: Europe Maps with animated year slider =====
-    with t5:
-        st.markdown("#### Europe Maps")
-        if not _HAS_PLOTLY:
-            st.warning("Plotly is required for map animation. pip install plotly")
+    elif view == _VIEWS[2]:
+        _tab_inequality(_sub(_normalize_income(df_exam_income)), sel_countries)
+
+    # ===== Tabs 4-5: Correlation Lab, Europe Maps (unfiltered tables) =====
+    else:
+        scr = _normalize_screening(df_screening)
+        mort = _normalize_mortality(df_mortality)
+        inc = _normalize_income(df_exam_income)
+        if view == _VIEWS[3]:
+            _tab_correlation(scr, mort, inc)
         else:
-            # Build long panel for animation
-            frames = []
-            if not scr.empty:
-                g = scr.groupby(["country","year"], as_index=False)["screening_rate"].median()
-                g["metric"] = "Screening (%)"; g = g.rename(columns={"screening_rate":"value"}); frames.append(g)
-            if not mort.empty and "age" in mort.columns:
-                m = mort.copy(); m["age"] = m["age"].astype(str)
-                under = m[m["age"].str.contains(r"(Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49)", regex=True, case=False)]
-                if not under.empty:
-                    g = under.groupby(["country","year"], as_index=False)["mortality_rate"].mean()
-                    g["metric"] = "Mortality under 50 (per 100k)"; g = g.rename(columns={"mortality_rate":"value"}); frames.append(g)
-            if not inc.empty:
-                e = inc.copy()
-                ag = e["age_group"].astype(str)
-                sub50 = e[ag.str.contains(r"(15-24|25-34|30-39|35-44|40-49|45-49|Y_LT50|Y_GE16_LT50)", regex=True, case=False)]
-                if not sub50.empty:
-                    gap = (sub50.pivot_table(index=["country","year"], columns="income_quintile", values="exam_rate", aggfunc="median")
-                                .assign(value=lambda d: d.get("Q5") - d.get("Q1"))
-                                .reset_index()
-                                .dropna(subset=["value"]))
-                    gap["metric"] = "Income gap Q5−Q1 (<50, pp)"; frames.append(gap[["country","year","value","metric"]])
-            if not frames:
-                st.info("No data available for maps.")
-            else:
-                panel = pd.concat(frames, ignore_index=True)
-                if y0 is not None and y1 is not None:
-                    panel = panel[(panel["year"] >= y0) & (panel["year"] <= y1)]
-                panel["iso3"] = panel["country"].map(_ISO2_TO_ISO3).fillna(panel["country"])
-                metric = st.selectbox("Metric", ["Screening (%)","Mortality under 50 (per 100k)","Income gap Q5−Q1 (<50, pp)"], index=0)
-                map_kind = st.radio("Map type", ["Choropleth", "Bubble"], index=0, horizontal=True)
-                data = panel[panel["metric"].eq(metric)].sort_values("year")
-                if data.empty:
-                    st.info("Metric not available for current selection.")
-                else:
-                    if map_kind == "Choropleth":
-                        fig = px.choropleth(
-                            data, locations="iso3", color="value", scope="europe",
-                            color_continuous_scale="RdPu", animation_frame="year",
-                            title=metric
-                        )
-                    else:
-                        fig = px.scatter_geo(
-                            data, locations="iso3", size="value", color="value",
-                            color_continuous_scale="RdPu", scope="europe",
-                            animation_frame="year", title=metric + " — Bubble size encodes value"
-                        )
-                    fig.update_layout(
-                        margin=dict(l=0, r=0, t=40, b=0),
-                        coloraxis_colorbar=dict(title=metric.split("(")[0].strip()),
-                        paper_bgcolor="white",
-                        geo=dict(bgcolor="rgba(0,0,0,0)")
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+            # Europe Maps with animated year slider
+            _tab_maps(scr, mort, inc, y0, y1)
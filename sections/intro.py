@@ -1,33 +1,33 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from pathlib import Path
 
 # Intro section for: “The Age of Risk: When Should We Really Start Screening?”
 _LOGO_PATH = Path("assets/pink-ribbon-logo.webp")
+_INTRO_CSS = """
+<style>
+.intro-logo { display:block; width:100%; height:auto; }
+/* Make expanders more visible and move arrow next to title */
+[data-testid="stExpander"] > details {
+    border: 1px solid var(--border); border-radius: 12px; background: var(--card);
+}
+[data-testid="stExpander"] summary {
+    list-style: none; padding: 0.9rem 1rem; font-weight: 600; color: var(--text);
+    display: flex; align-items: center; gap: 8px;
+}
+/* Expander body */
+[data-testid="stExpander"] .stMarkdown { padding: 0 1rem 1rem 1rem; }
+</style>
+"""
 
 def render_intro(df_screening: pd.DataFrame | None = None,
                  df_mortality: pd.DataFrame | None = None,
                  df_exam_income: pd.DataFrame | None = None) -> None:
 
     # ===== Local CSS for the intro =====
-    st.markdown(
-        """
-        <style>
-        .intro-logo { display:block; width:100%; height:auto; }
-        /* Make expanders more visible and move arrow next to title */
-        [data-testid="stExpander"] > details {
-            border: 1px solid var(--border); border-radius: 12px; background: var(--card);
-        }
-        [data-testid="stExpander"] summary {
-            list-style: none; padding: 0.9rem 1rem; font-weight: 600; color: var(--text);
-            display: flex; align-items: center; gap: 8px;
-        }
-        /* Expander body */
-        [data-testid="stExpander"] .stMarkdown { padding: 0 1rem 1rem 1rem; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    # Re-sent every rerun on purpose: Streamlit drops elements a rerun does not emit
+    st.markdown(_INTRO_CSS, unsafe_allow_html=True)
 
     # ===== Header / Branding =====
     c1, c2 = st.columns([1, 6])
@@ -108,13 +108,14 @@ def render_intro(df_screening: pd.DataFrame | None = None,
     years_mort = _meta_stats(df_mortality)
     years_income = _meta_stats(df_exam_income)
 
-    countries = set()
-    for d in (df_screening, df_mortality, df_exam_income):
-        if isinstance(d, pd.DataFrame) and not d.empty and "country" in d.columns:
-            countries.update(d["country"].dropna().unique().tolist())
+    # Per-table uniques merged by one np.unique, no Python set/list building
+    parts = [np.asarray(d["country"].dropna().unique(), dtype=object)
+             for d in (df_screening, df_mortality, df_exam_income)
+             if isinstance(d, pd.DataFrame) and not d.empty and "country" in d.columns]
+    n_countries = np.unique(np.concatenate(parts)).size if parts else 0
 
     k1, k2, k3, k4 = st.columns(4)
-    k1.metric("Countries covered", f"{len(countries)}")
+    k1.metric("Countries covered", f"{n_countries}")
     k2.metric("Screening years", years_screen or "")
     k3.metric("Mortality years", years_mort or "")
     k4.metric("Income survey years", years_income or "")
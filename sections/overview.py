@@ -1,54 +1,121 @@
 # sections/overview.py
 import streamlit as st
 import pandas as pd
-import altair as alt
+import numpy as np
 import re
-from typing import Iterable
+from utils.filters import apply_filters
 
 # ===== Utilities =====
-def _coerce_year(df: pd.DataFrame) -> pd.DataFrame:
+# Columns each overview block needs; checked before any filtering
+_REQUIRED_SCR = {"country", "year", "screening_rate"}
+_REQUIRED_MORT = {"country", "year", "mortality_rate"}
+_REQUIRED_INC = {"country", "year", "income_quintile", "exam_rate"}
+_QU_TO_Q = {f"QU{i}": f"Q{i}" for i in range(1, 6)}
+_UNDER50_OR_TOTAL = re.compile(r"(?i:Y_LT|Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49)|^TOTAL$")
+
+# Cached on frame contents (not id(): ids can be reused after a daily reload),
+# so reruns with the same data skip the coercion, regex scan and groupbys.
+@st.cache_data(show_spinner=False)
+def _coerce(df: pd.DataFrame | None) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
-    df = df.copy()
-    if "year" in df.columns:
-        df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
-    return df
-
-def _filter_years(df: pd.DataFrame, y0: int | None, y1: int | None) -> pd.DataFrame:
-    if df is None or df.empty or "year" not in df.columns or y0 is None or y1 is None:
-        return df
-    return df[(df["year"] >= y0) & (df["year"] <= y1)]
-
-def _filter_countries(df: pd.DataFrame, countries: list[str]) -> pd.DataFrame:
-    if df is None or df.empty or "country" not in df.columns or not countries:
-        return df
-    return df[df["country"].isin(countries)]
-
+    # Only the converted columns are rebuilt; the rest of the frame is not copied
+    cols = {}
+    # Integer years (int16 from utils.prep) are kept as-is: plain NumPy compares, no Int64 mask
+    if "year" in df.columns and not pd.api.types.is_integer_dtype(df["year"]):
+        cols["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    # Low-cardinality keys as categoricals: filters and groupbys compare int codes
+    for col in ("country", "age"):
+        if col in df.columns:
+            cols[col] = df[col].astype("category")
+    return df.assign(**cols) if cols else df
+
+def _as_str(s: pd.Series) -> pd.Series:
+    # Category and string columns already expose .str; only other dtypes are cast
+    if s.dtype == "string" or isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    return s.astype("string")
+
+def _canon_quintile(col: pd.Series) -> pd.Series:
+    """Upper-cased quintile labels with QU1..QU5 read as Q1..Q5: one dict lookup per distinct label, no regex."""
+    codes, labels = pd.factorize(col)
+    lut = np.array([_QU_TO_Q.get(u, u) for u in labels.astype(str).str.upper()] + [None], dtype=object)
+    return pd.Series(lut[codes], index=col.index, name=col.name)  # code -1 (missing) → None
+
+@st.cache_data(show_spinner=False)
 def _mortality_under50(df_mortality: pd.DataFrame) -> pd.DataFrame:
     if df_mortality is None or df_mortality.empty or "age" not in df_mortality.columns:
         return df_mortality
-    m = df_mortality.copy()
-    age = m["age"].astype(str)
-    mask = (
-        age.str.contains("Y_LT", case=False)
-        | age.str.contains(r"Y0-4|Y5-14|Y15-24|Y25-34|Y35-44|Y45-49", regex=True, case=False)
-        | age.eq("TOTAL")
-    )
-    return m[mask]
-
-def _styled_chart(chart, title=None, height=340):
-    return (
-        chart.properties(
-            title=title or "",
-            width="container",
-            height=height,
-            background="white",
-            padding={"left": 10, "right": 10, "top": 10, "bottom": 10},
-        )
-        .configure_view(stroke="lightgray", strokeWidth=1.2)
-        .configure_axis(grid=False, domainColor="lightgray", labelColor="#333", titleColor="#333")
-        .configure_title(anchor="start", fontSize=14, color="#222", fontWeight="bold")
-    )
+    age = df_mortality["age"]
+    # One scan: under-50 age codes (any case) or the exact TOTAL fallback.
+    # On a categorical only the distinct labels are matched, then gathered by code.
+    if isinstance(age.dtype, pd.CategoricalDtype):
+        hit = age.cat.categories.astype(str).str.contains(_UNDER50_OR_TOTAL)
+        mask = age.cat.codes.isin(hit.nonzero()[0]).to_numpy()
+    else:
+        mask = _as_str(age).str.contains(_UNDER50_OR_TOTAL, na=False)
+    return df_mortality.loc[mask]
+
+@st.cache_data(show_spinner=False)
+def _country_year_mean(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Mean of ``col`` per (country, year), in (country, year) order for the trend lines."""
+    return (df.groupby(["country", "year"], as_index=False, observed=True, sort=False)[col].mean()
+              .sort_values(["country", "year"]))
+
+@st.cache_data(show_spinner=False)
+def _mortality_trends(df_mortality: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Full-table (country, year) mortality means: explicit under-50 ages, and the
+    TOTAL-inclusive fallback. Filters only select rows of these small tables.
+    """
+    sub = _mortality_under50(df_mortality)
+    explicit = sub[sub["age"].ne("TOTAL")] if "age" in sub.columns else sub
+    return _country_year_mean(explicit, "mortality_rate"), _country_year_mean(sub, "mortality_rate")
+
+@st.cache_data(show_spinner=False)
+def _median_by_year(df: pd.DataFrame, col: str) -> pd.Series:
+    """Median of ``col`` per year in one groupby (year ascending): KPIs read the first/last entries."""
+    return df.groupby("year", sort=True)[col].median()
+
+# Raw Vega-Lite for the trend lines (same look as the former Altair styling): with
+# st.vega_lite_chart(data, spec) the frame ships as Arrow, not inline JSON, and
+# no Altair validation / to_dict runs per rerun.
+_TREND_CONFIG = {
+    "view": {"stroke": "lightgray", "strokeWidth": 1.2},
+    "axis": {"grid": False, "domainColor": "lightgray", "labelColor": "#333", "titleColor": "#333"},
+    "title": {"anchor": "start", "fontSize": 14, "color": "#222", "fontWeight": "bold"},
+}
+
+def _trend_spec(col: str, y_title: str, height: int = 340) -> dict:
+    """Per-country line chart of ``col`` by year."""
+    return {
+        "title": "",
+        "width": "container",
+        "height": height,
+        "background": "white",
+        "padding": {"left": 10, "right": 10, "top": 10, "bottom": 10},
+        "mark": {"type": "line", "point": True},
+        "encoding": {
+            "x": {"field": "year", "type": "ordinal", "title": "Year"},
+            "y": {"field": col, "type": "quantitative", "title": y_title},
+            "color": {"field": "country", "type": "nominal", "title": "Country"},
+            "tooltip": [{"field": "country", "type": "nominal"}, {"field": "year", "type": "quantitative"},
+                        {"field": col, "type": "quantitative", "format": ".1f"}],
+        },
+        "config": _TREND_CONFIG,
+    }
+
+_MAX_POINT_MARKS = 500
+
+def _line_spec(spec: dict, n_rows: int) -> dict:
+    """Per-point markers only for small series: past _MAX_POINT_MARKS the line alone is drawn."""
+    if n_rows < _MAX_POINT_MARKS:
+        return spec
+    return {**spec, "mark": {"type": "line", "point": False}}
+
+# Built once at import: reruns pass the same spec objects, only the data changes
+_SCR_TREND_SPEC = _trend_spec("screening_rate", "Organized screening rate (%)")
+_MORT_TREND_SPEC = _trend_spec("mortality_rate", "Deaths per 100k, under 50 preferred")
 
 # ===== Render =====
 def render_overview(
@@ -58,61 +125,69 @@ def render_overview(
 ) -> None:
     st.subheader("Overview")
 
-    df_screening = _coerce_year(df_screening)
-    df_mortality  = _coerce_year(df_mortality)
-    df_exam_income = _coerce_year(df_exam_income)
+    df_screening = _coerce(df_screening)
+    df_mortality  = _coerce(df_mortality)
+    df_exam_income = _coerce(df_exam_income)
 
     # ---- read global filters from app.py ----
     gf = st.session_state.get("global_filters", {}) or {}
     countries = gf.get("countries", ["FR"])
     y0, y1 = gf.get("y0"), gf.get("y1")
 
+    # Schema check first: tables missing their columns are never filtered or aggregated
+    has_scr = _REQUIRED_SCR.issubset(df_screening.columns)
+    has_mort = _REQUIRED_MORT.issubset(df_mortality.columns)
+    has_inc = _REQUIRED_INC.issubset(df_exam_income.columns)
+    if not (has_scr or has_mort or has_inc):
+        st.info("No usable screening, mortality or income table loaded.")
+        return
+
     # Apply filters
-    df_screening_f = _filter_years(_filter_countries(df_screening, countries), y0, y1)
-    df_mortality_f = _filter_years(_filter_countries(df_mortality, countries), y0, y1)
-    df_exam_income_f = _filter_years(_filter_countries(df_exam_income, countries), y0, y1)
+    fc = tuple(countries)
+    df_screening_f = apply_filters(df_screening, fc, y0, y1) if has_scr else df_screening.iloc[:0]
+    df_mortality_f = apply_filters(df_mortality, fc, y0, y1) if has_mort else df_mortality.iloc[:0]
+    df_exam_income_f = apply_filters(df_exam_income, fc, y0, y1) if has_inc else df_exam_income.iloc[:0]
+
+    if df_screening_f.empty and df_mortality_f.empty and df_exam_income_f.empty:
+        # Nothing selected in any table: skip KPIs and chart builds
+        st.info("No data for the selected countries and years.")
+        return
 
     # ===== KPIs =====
     k1, k2, k3 = st.columns(3)
 
     scr_kpi = scr_delta = ""
-    if not df_screening_f.empty and {"screening_rate", "year"}.issubset(df_screening_f.columns):
-        last_year = df_screening_f["year"].dropna().max()
-        first_year = df_screening_f["year"].dropna().min()
-        latest = df_screening_f[df_screening_f["year"].eq(last_year)]
-        base = df_screening_f[df_screening_f["year"].eq(first_year)]
-        if not latest.empty:
-            scr_kpi = f"{latest['screening_rate'].median():.1f}"
-        if not latest.empty and not base.empty:
-            scr_delta = f"{latest['screening_rate'].median() - base['screening_rate'].median():+.1f} vs {first_year}"
+    if not df_screening_f.empty:
+        by_year = _median_by_year(df_screening_f, "screening_rate")
+        if not by_year.empty:
+            scr_kpi = f"{by_year.iloc[-1]:.1f}"
+            scr_delta = f"{by_year.iloc[-1] - by_year.iloc[0]:+.1f} vs {by_year.index[0]}"
     k1.metric("Organized screening median (latest year)", scr_kpi, scr_delta)
 
     mort_kpi = mort_delta = ""
     mort_sub = _mortality_under50(df_mortality_f)
-    if mort_sub is not None and not mort_sub.empty and {"mortality_rate", "year"}.issubset(mort_sub.columns):
-        explicit = mort_sub[mort_sub["age"].astype(str) != "TOTAL"] if "age" in mort_sub.columns else mort_sub
+    if not mort_sub.empty:
+        explicit = mort_sub[mort_sub["age"].ne("TOTAL")] if "age" in mort_sub.columns else mort_sub
         chosen = explicit if not explicit.empty else mort_sub
-        last_year_m = chosen["year"].dropna().max()
-        first_year_m = chosen["year"].dropna().min()
-        latest_m = chosen[chosen["year"].eq(last_year_m)]
-        base_m = chosen[chosen["year"].eq(first_year_m)]
-        if not latest_m.empty:
-            mort_kpi = f"{latest_m['mortality_rate'].median():.1f}"
-        if not latest_m.empty and not base_m.empty:
-            mort_delta = f"{latest_m['mortality_rate'].median() - base_m['mortality_rate'].median():+.1f} vs {first_year_m}"
+        by_year_m = _median_by_year(chosen, "mortality_rate")
+        if not by_year_m.empty:
+            mort_kpi = f"{by_year_m.iloc[-1]:.1f}"
+            mort_delta = f"{by_year_m.iloc[-1] - by_year_m.iloc[0]:+.1f} vs {by_year_m.index[0]}"
     k2.metric("Mortality median under 50 (per 100k, latest)", mort_kpi, mort_delta)
 
     # Income gap Q5 − Q1 under 50 (latest survey year)
     gap_val = gap_note = ""
-    ei = df_exam_income_f.copy()
-    if not ei.empty and {"income_quintile","exam_rate","year"}.issubset(ei.columns):
-        qcol = ei["income_quintile"].astype(str).str.upper()
-        ei.loc[qcol.str.match(r"^QU([1-5])$"), "income_quintile"] = "Q" + qcol.str.extract(r"^QU([1-5])$")[0]
+    ei = df_exam_income_f
+    if not ei.empty:
+        # QU1..QU5 read as Q1..Q5, kept as a separate Series instead of writing into a copy
+        # (a plain object Series: the categorical column would reject new labels)
+        quint = _canon_quintile(ei["income_quintile"])
         last_year_e = ei["year"].dropna().max()
-        e_last = ei[ei["year"].eq(last_year_e)]
-        if not e_last.empty:
-            q5 = e_last[e_last["income_quintile"].eq("Q5")]["exam_rate"].median()
-            q1 = e_last[e_last["income_quintile"].eq("Q1")]["exam_rate"].median()
+        in_last = ei["year"].eq(last_year_e)
+        if in_last.any():
+            # Every quintile's median in one groupby over the latest year
+            by_q = ei.loc[in_last, "exam_rate"].groupby(quint[in_last], sort=False).median()
+            q5, q1 = by_q.get("Q5"), by_q.get("Q1")
             if pd.notna(q5) and pd.notna(q1):
                 gap_val = f"{(q5 - q1):.1f} pp"
                 gap_note = f"Year {int(last_year_e)}"
@@ -122,45 +197,20 @@ def render_overview(
 
     # ===== Screening trend =====
     st.markdown("#### Screening participation over time")
-    if not df_screening_f.empty and {"screening_rate", "year", "country"}.issubset(df_screening_f.columns):
-        scr_ts = (
-            df_screening_f.groupby(["country", "year"], as_index=False)["screening_rate"].mean()
-            .sort_values(["country", "year"])
-        )
-        line = (
-            alt.Chart(scr_ts)
-            .mark_line(point=True)
-            .encode(
-                x=alt.X("year:O", title="Year"),
-                y=alt.Y("screening_rate:Q", title="Organized screening rate (%)"),
-                color=alt.Color("country:N", title="Country"),
-                tooltip=["country", "year", alt.Tooltip("screening_rate:Q", format=".1f")],
-            )
-        )
-        st.altair_chart(_styled_chart(line), use_container_width=True)
+    if not df_screening_f.empty:
+        # Aggregated once over the full table; filtering the small result gives the same rows
+        scr_ts = apply_filters(_country_year_mean(df_screening, "screening_rate"), fc, y0, y1)
+        st.vega_lite_chart(scr_ts, _line_spec(_SCR_TREND_SPEC, len(scr_ts)), use_container_width=True)
     else:
         st.info("Screening table not available or missing screening_rate.")
 
     # ===== Mortality trend =====
     st.markdown("#### Mortality trend (female C50)")
-    if mort_sub is not None and not mort_sub.empty and {"mortality_rate", "year", "country"}.issubset(mort_sub.columns):
-        chart_df = mort_sub[mort_sub.get("age", "").astype(str) != "TOTAL"] if "age" in mort_sub.columns else mort_sub
-        if chart_df.empty:
-            chart_df = mort_sub
-        mort_ts = (
-            chart_df.groupby(["country", "year"], as_index=False)["mortality_rate"].mean()
-            .sort_values(["country", "year"])
-        )
-        line = (
-            alt.Chart(mort_ts)
-            .mark_line(point=True)
-            .encode(
-                x=alt.X("year:O", title="Year"),
-                y=alt.Y("mortality_rate:Q", title="Deaths per 100k, under 50 preferred"),
-                color=alt.Color("country:N", title="Country"),
-                tooltip=["country", "year", alt.Tooltip("mortality_rate:Q", format=".1f")],
-            )
-        )
-        st.altair_chart(_styled_chart(line), use_container_width=True)
+    if not mort_sub.empty:
+        explicit_ts, all_ts = _mortality_trends(df_mortality)
+        mort_ts = apply_filters(explicit_ts, fc, y0, y1)
+        if mort_ts.empty:
+            mort_ts = apply_filters(all_ts, fc, y0, y1)
+        st.vega_lite_chart(mort_ts, _line_spec(_MORT_TREND_SPEC, len(mort_ts)), use_container_width=True)
     else:
         st.info("Mortality table not available or missing mortality_rate.")
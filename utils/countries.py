@@ -0,0 +1,14 @@
+from types import MappingProxyType
+
+# Country code → human name (used in sidebar labels).
+# Lives in an imported module so it is built once per process, not on every rerun.
+CODE_TO_NAME = MappingProxyType({
+    "FR":"France","BE":"Belgium","DE":"Germany","ES":"Spain","IT":"Italy","PT":"Portugal",
+    "IE":"Ireland","NL":"Netherlands","LU":"Luxembourg","AT":"Austria","CH":"Switzerland",
+    "GB":"United Kingdom","UK":"United Kingdom","SE":"Sweden","NO":"Norway","FI":"Finland","DK":"Denmark",
+    "IS":"Iceland","EE":"Estonia","LV":"Latvia","LT":"Lithuania","PL":"Poland","CZ":"Czechia","SK":"Slovakia",
+    "HU":"Hungary","SI":"Slovenia","HR":"Croatia","RO":"Romania","BG":"Bulgaria","GR":"Greece","EL":"Greece",
+    "CY":"Cyprus","MT":"Malta","AL":"Albania","BA":"Bosnia and Herzegovina","ME":"Montenegro","RS":"Serbia",
+    "MK":"North Macedonia"
+})
+NAME_TO_CODE = MappingProxyType({v:k for k,v in CODE_TO_NAME.items()})
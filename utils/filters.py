@@ -0,0 +1,72 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+def _year_values(col: pd.Series) -> np.ndarray:
+    """Year as a NumPy array: plain (non-nullable) int columns as-is, others as float64 with NaN."""
+    if isinstance(col.dtype, np.dtype) and col.dtype.kind == "i":
+        return col.to_numpy()
+    return col.to_numpy(dtype="float64", na_value=np.nan)
+
+def _sorted_positions(df: pd.DataFrame, countries: tuple[str, ...], y0: int | None, y1: int | None) -> np.ndarray | None:
+    """
+    Row positions for the selection when ``df`` is sorted by (country, year), found with
+    binary searches per country instead of a full-frame mask. None if the frame is not
+    sorted that way (the caller then falls back to masking).
+    """
+    col = df["country"]
+    if col.hasnans or not col.is_monotonic_increasing:
+        return None
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        c = col.cat.codes.to_numpy()
+        keys = col.cat.categories.get_indexer(list(countries))
+        keys = np.unique(keys[keys >= 0])
+    else:
+        c = col.to_numpy()
+        keys = sorted(set(countries))
+    y = _year_values(df["year"])
+    if (y.dtype.kind == "f" and np.isnan(y).any()) or np.any((np.diff(y) < 0) & (c[1:] == c[:-1])):
+        # Missing years, or years not ascending within a country
+        return None
+    starts = np.searchsorted(c, keys, side="left")
+    ends = np.searchsorted(c, keys, side="right")
+    parts = []
+    for lo, hi in zip(starts, ends):
+        if lo == hi:
+            continue
+        if y0 is not None and y1 is not None:
+            ys = y[lo:hi]
+            lo, hi = lo + np.searchsorted(ys, y0, side="left"), lo + np.searchsorted(ys, y1, side="right")
+        parts.append(np.arange(lo, hi))
+    return np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+
+@st.cache_data(show_spinner=False)
+def apply_filters(df: pd.DataFrame | None, countries: tuple[str, ...], y0: int | None, y1: int | None) -> pd.DataFrame | None:
+    """
+    Country + year slice of a table.
+    Tables sorted by (country, year) at ingest are sliced with searchsorted; others get
+    one boolean mask and a single gather.
+    Cached on (data, countries, y0, y1): reruns with unchanged filters are a lookup.
+    """
+    if df is None or df.empty:
+        return df
+    if countries and {"country", "year"}.issubset(df.columns):
+        pos = _sorted_positions(df, countries, y0, y1)
+        if pos is not None:
+            return df.iloc[pos]
+    mask = np.ones(len(df), dtype=bool)
+    if "country" in df.columns and countries:
+        col = df["country"]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            # Compare small integer codes instead of hashing every string
+            wanted = col.cat.categories.get_indexer(list(countries))
+            mask &= np.isin(col.cat.codes.to_numpy(), wanted[wanted >= 0])
+        else:
+            mask &= col.isin(countries).to_numpy()
+    if "year" in df.columns and y0 is not None and y1 is not None:
+        y = _year_values(df["year"])
+        # Both bounds through one scratch buffer, folded into mask in place
+        tmp = np.greater_equal(y, y0)
+        mask &= tmp
+        mask &= np.less_equal(y, y1, out=tmp)
+    return df.loc[mask]
@@ -1,8 +1,55 @@
+import hashlib
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
 from utils.prep import clean_screening, clean_mortality, clean_exam_income
 
+# Bump when the cleaned schema changes in a way the stamp below cannot see
+_SIDECAR_VERSION = 1
+_STAMP_KEY = b'sidecar_stamp'
+# Cleaning and dtype logic the sidecars depend on
+_CODE_PATHS = (Path(__file__).with_name('prep.py'), Path(__file__))
+
+def _sidecar_stamp(clean, csv_path):
+    """
+    Content hash of everything a cleaned table depends on: the CSV bytes, the cleaning
+    code, the pandas/pyarrow versions and _SIDECAR_VERSION. Mtimes are not trusted.
+    """
+    h = hashlib.sha256(f'{_SIDECAR_VERSION}|{clean.__name__}|{pd.__version__}|{pa.__version__}'.encode())
+    for path in (csv_path, *_CODE_PATHS):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest().encode()
+
+def _load_cleaned(clean, csv_path):
+    """
+    Cleaned table, read from a Parquet sidecar (data/<name>.parquet) when the stamp stored
+    in its metadata matches the current inputs; otherwise cleaned from CSV and the sidecar
+    rewritten. Parquet keeps the cleaned dtypes (categories, int16), so no re-parsing or casting.
+    The sidecar is optional: any read or write failure falls back to the CSV path.
+    """
+    csv_path = Path(csv_path)
+    pq_path = csv_path.with_suffix('.parquet')
+    stamp = _sidecar_stamp(clean, csv_path)
+    if pq_path.exists():
+        try:
+            if (pq.read_schema(pq_path).metadata or {}).get(_STAMP_KEY) == stamp:
+                return pd.read_parquet(pq_path, engine='pyarrow')
+        except (OSError, pa.ArrowException, ValueError):
+            pass  # unreadable sidecar: rebuild it below
+    df = clean(csv_path)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _STAMP_KEY: stamp})
+        pq.write_table(table, pq_path, compression='zstd')
+    except (OSError, pa.ArrowException, ValueError):
+        pass  # read-only deployment or unserializable frame: keep cleaning from CSV
+    return df
+
 def load_data():
-    df_screening = clean_screening('data/breast_cancer_screening.csv')
-    df_mortality = clean_mortality('data/death_due_to_cancer.csv')
-    df_exam_income = clean_exam_income('data/breast_exam_income.csv')
+    df_screening = _load_cleaned(clean_screening, 'data/breast_cancer_screening.csv')
+    df_mortality = _load_cleaned(clean_mortality, 'data/death_due_to_cancer.csv')
+    df_exam_income = _load_cleaned(clean_exam_income, 'data/breast_exam_income.csv')
     return df_screening, df_mortality, df_exam_income
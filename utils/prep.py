@@ -1,4 +1,21 @@
 import pandas as pd
+import numpy as np
+
+
+def _label_mask(col, test):
+    """
+    Row mask from ``test`` applied to the column's distinct upper-cased labels;
+    rows are mapped through the factorized codes, missing labels fail.
+    """
+    codes, labels = pd.factorize(col)
+    hit = np.append(np.asarray(test(pd.Index(labels.astype(str)).str.upper()), dtype=bool), False)
+    return hit[codes]  # code -1 (missing) lands on the trailing False
+
+
+def _as_category(df, cols):
+    """Cast low-cardinality label columns to category (lexically sorted, so sort order is unchanged)."""
+    return df.assign(**{c: df[c].astype('category') for c in cols})
+
 
 # === Breast cancer screening ===
 def clean_screening(path='data/breast_cancer_screening.csv'):
@@ -6,10 +23,11 @@ def clean_screening(path='data/breast_cancer_screening.csv'):
     Cleans the breast cancer screening dataset based on the exploration findings.
 
     Steps:
-        1. Drop irrelevant or mostly missing columns: DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG.
-        2. Keep only rows related to breast cancer (icd10 == 'C50').
-        3. Keep only organized screening programs (source == 'PRG').
-        4. Rename columns for clarity.
+        1. Read only the analytical columns (DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG are never parsed).
+        2. Keep only breast cancer rows (icd10 == 'C50') from organized screening
+           programs (source == 'PRG'), in one mask.
+        3. Rename columns for clarity.
+        4. Convert data types.
         5. Reset index and sort by country and year.
 
     Returns:
@@ -17,31 +35,24 @@ def clean_screening(path='data/breast_cancer_screening.csv'):
         ['country', 'year', 'unit', 'source', 'icd10', 'screening_rate']
     """
 
-    # Load the dataset
-    df = pd.read_csv(path)
-
-    # Drop irrelevant columns
-    df = df.drop(columns=['DATAFLOW', 'LAST UPDATE', 'freq', 'CONF_STATUS', 'OBS_FLAG'], errors='ignore')
-
-    # Keep only breast cancer (C50)
-    df = df[df['icd10'] == 'C50']
-
-    # Keep only organized screening programs (PRG)
-    df = df[df['source'] == 'PRG']
+    # Load the dataset (multithreaded pyarrow reader, unused columns skipped)
+    df = pd.read_csv(path, engine='pyarrow', usecols=['unit', 'source', 'icd10', 'geo', 'TIME_PERIOD', 'OBS_VALUE'])
 
-    # Rename columns for clarity
-    df = df.rename(columns={
+    # Keep only breast cancer (C50) from organized screening programs (PRG):
+    # one combined mask, rows and columns selected in a single .loc, then renamed
+    mask = df['icd10'].eq('C50') & df['source'].eq('PRG')
+    df = df.loc[mask, ['geo', 'TIME_PERIOD', 'unit', 'source', 'icd10', 'OBS_VALUE']].rename(columns={
         'geo': 'country',
         'TIME_PERIOD': 'year',
         'OBS_VALUE': 'screening_rate'
     })
 
-    # Keep only relevant columns
-    df = df[['country', 'year', 'unit', 'source', 'icd10', 'screening_rate']]
-
     # Convert data types
-    df['year'] = df['year'].astype(int)
+    # (int16 years; rates stay float64 so one-decimal KPIs round exactly as in the source)
+    df['year'] = df['year'].astype('int16')
     df['screening_rate'] = pd.to_numeric(df['screening_rate'], errors='coerce')
+    # Repeated labels as categories: filters and groupbys work on int codes
+    df = _as_category(df, ['country', 'unit', 'source', 'icd10'])
 
     # Sort and reset index
     df = df.sort_values(by=['country', 'year']).reset_index(drop=True)
@@ -55,12 +66,11 @@ def clean_mortality(path='data/death_due_to_cancer.csv'):
     Cleans the death rate by cancer dataset based on the updated exploration findings.
 
     Steps:
-        1. Drop irrelevant or mostly missing columns: DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG.
-        2. Keep only female records (sex == 'F').
-        3. Keep only breast cancer data (icd10 == 'C50').
-        4. Rename columns for clarity.
-        5. Keep only relevant analytical columns.
-        6. Convert data types and sort for consistency.
+        1. Read only the analytical columns (DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG are never parsed).
+        2. Keep only female breast cancer records (sex == 'F', icd10 == 'C50'),
+           in one mask together with the relevant analytical columns.
+        3. Rename columns for clarity.
+        4. Convert data types and sort for consistency.
 
     Returns:
         Cleaned pandas DataFrame with columns:
@@ -69,31 +79,26 @@ def clean_mortality(path='data/death_due_to_cancer.csv'):
 
     import pandas as pd
 
-    # Load dataset
-    df = pd.read_csv(path)
-
-    # Drop irrelevant or mostly missing columns
-    df = df.drop(columns=['DATAFLOW', 'LAST UPDATE', 'freq', 'CONF_STATUS', 'OBS_FLAG'], errors='ignore')
-
-    # Keep only female data
-    df = df[df['sex'].astype(str).str.upper().str.contains('F', na=False)]
-
-    # Keep only breast cancer (C50)
-    df = df[df['icd10'].astype(str).str.upper().str.contains('C50', na=False)]
+    # Load dataset (multithreaded pyarrow reader, unused columns skipped)
+    df = pd.read_csv(path, engine='pyarrow', usecols=['unit', 'sex', 'age', 'icd10', 'geo', 'TIME_PERIOD', 'OBS_VALUE'])
 
-    # Rename columns for clarity
-    df = df.rename(columns={
+    # Keep only female data with breast cancer (C50), in one combined mask;
+    # rows and the relevant columns are selected in a single .loc, then renamed
+    mask = (_label_mask(df['sex'], lambda u: u.str.contains('F'))
+            & _label_mask(df['icd10'], lambda u: u.str.contains('C50')))
+    df = df.loc[mask, ['geo', 'TIME_PERIOD', 'unit', 'age', 'sex', 'icd10', 'OBS_VALUE']].rename(columns={
         'geo': 'country',
         'TIME_PERIOD': 'year',
         'OBS_VALUE': 'mortality_rate'
     })
 
-    # Keep only relevant columns
-    df = df[['country', 'year', 'unit', 'age', 'sex', 'icd10', 'mortality_rate']]
-
     # Convert data types
-    df['year'] = pd.to_numeric(df['year'], errors='coerce').astype('Int64')
+    # Rows without a usable year are dropped so year stays a plain int16 (no nullable mask)
+    year = pd.to_numeric(df['year'], errors='coerce')
+    has_year = year.notna()
+    df = df[has_year].assign(year=year[has_year].astype('int16'))
     df['mortality_rate'] = pd.to_numeric(df['mortality_rate'], errors='coerce')
+    df = _as_category(df, ['country', 'unit', 'age', 'sex', 'icd10'])
 
     # Sort and reset index
     df = df.sort_values(by=['country', 'year']).reset_index(drop=True)
@@ -107,29 +112,24 @@ def clean_exam_income(path='data/breast_exam_income.csv'):
     Cleans the self-reported breast examination dataset based on the exploration findings.
 
     Steps:
-        1. Drop irrelevant or mostly missing columns: DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG.
-        2. Drop missing values in OBS_VALUE.
+        1. Read only the analytical columns (DATAFLOW, LAST UPDATE, freq, CONF_STATUS, OBS_FLAG are never parsed).
+        2. Drop missing values in OBS_VALUE, keeping only the relevant analytical columns.
         3. Rename columns for clarity.
-        4. Keep only relevant analytical columns.
-        5. Convert data types.
-        6. Sort and reset index.
+        4. Convert data types.
+        5. Sort by country and year, then reset index.
 
     Returns:
         Cleaned pandas DataFrame with columns:
         ['country', 'year', 'duration', 'age_group', 'income_quintile', 'unit', 'exam_rate']
     """
 
-    # Load dataset
-    df = pd.read_csv(path)
-
-    # Drop irrelevant or mostly missing columns
-    df = df.drop(columns=['DATAFLOW', 'LAST UPDATE', 'freq', 'CONF_STATUS', 'OBS_FLAG'], errors='ignore')
-
-    # Drop rows with missing exam rate
-    df = df.dropna(subset=['OBS_VALUE'])
+    # Load dataset (multithreaded pyarrow reader, unused columns skipped)
+    df = pd.read_csv(path, engine='pyarrow',
+                     usecols=['duration', 'age', 'quant_inc', 'unit', 'geo', 'TIME_PERIOD', 'OBS_VALUE'])
 
-    # Rename columns for clarity
-    df = df.rename(columns={
+    # Drop rows with missing exam rate, keeping only the relevant columns in the same .loc
+    df = df.loc[df['OBS_VALUE'].notna(),
+                ['geo', 'TIME_PERIOD', 'duration', 'age', 'quant_inc', 'unit', 'OBS_VALUE']].rename(columns={
         'geo': 'country',
         'TIME_PERIOD': 'year',
         'age': 'age_group',
@@ -137,14 +137,12 @@ def clean_exam_income(path='data/breast_exam_income.csv'):
         'OBS_VALUE': 'exam_rate'
     })
 
-    # Keep only relevant columns
-    df = df[['country', 'year', 'duration', 'age_group', 'income_quintile', 'unit', 'exam_rate']]
-
     # Convert data types
-    df['year'] = df['year'].astype(int)
+    df['year'] = df['year'].astype('int16')
     df['exam_rate'] = pd.to_numeric(df['exam_rate'], errors='coerce')
+    df = _as_category(df, ['country', 'duration', 'age_group', 'income_quintile', 'unit'])
 
-    # Sort and reset index
-    df = df.sort_values(by=['country', 'income_quintile']).reset_index(drop=True)
+    # Sort and reset index (country/year first, so filters can binary-search)
+    df = df.sort_values(by=['country', 'year', 'income_quintile']).reset_index(drop=True)
 
     return df
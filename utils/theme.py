@@ -0,0 +1,23 @@
+import streamlit as st
+from pathlib import Path
+
+_CSS_PATH = Path("assets/theme.css")
+
+@st.cache_data(show_spinner=False)
+def _css():
+    return _CSS_PATH.read_text(encoding="utf-8")
+
+def apply_theme():
+    """
+    Page config + global stylesheet, shared by every entry point.
+
+    Must be the first Streamlit call of the script. The <style> block is
+    emitted on every rerun on purpose: Streamlit drops elements that a rerun
+    does not re-send, so guarding it per session would strip the theme.
+    """
+    st.set_page_config(
+        page_title="The Age of Risk | Breast Cancer Screening",
+        page_icon="assets/pink-ribbon-logo.webp",
+        layout="wide"
+    )
+    st.markdown(f"<style>{_css()}</style>", unsafe_allow_html=True)